@@ -30,9 +30,16 @@ If (0 -ne $errcode_) {
   Exit
 }
 
-# Run the test
+# Run the test. If pytest-xdist is installed, spread the test files across the cores
+# (keeping each file's tests on one worker, since some test classes share
+# fixtures); otherwise run the tests serially with unittest.
 #
 $env:PYTHONPATH="$pwd\src"
 $rcmd = "python"
-$rargs = "-m unittest discover -s ./tests" -Split " "
+& $rcmd -c "import xdist" 2>$null
+If (0 -eq $LASTEXITCODE) {
+  $rargs = "-m pytest -q -n auto --dist=loadfile ./tests" -Split " "
+} Else {
+  $rargs = "-m unittest discover -s ./tests" -Split " "
+}
 & $rcmd $rargs
@@ -3,4 +3,12 @@
 
 # Run this from the root directory of the project
 #
-PYTHONPATH="$(pwd)/src" python -m unittest discover -s ./tests
+# If pytest-xdist is installed, spread the test files across the cores
+# (keeping each file's tests on one worker, since some test classes share
+# fixtures); otherwise run the tests serially with unittest.
+#
+if python -c "import xdist" 2>/dev/null; then
+  PYTHONPATH="$(pwd)/src" python -m pytest -q -n auto --dist=loadfile ./tests
+else
+  PYTHONPATH="$(pwd)/src" python -m unittest discover -s ./tests
+fi
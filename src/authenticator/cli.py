@@ -11,13 +11,63 @@ This implementation requires:
     * cryptography 1.3 or later (see https://cryptography.io/en/latest/)
     * python-dateutil 2.1 or later
         (see https://pypi.python.org/pypi/python-dateutil/2.1)
-    * six 1.10 or later (https://pypi.python.org/pypi/six/1.10.0)
 
 """
 
+import argparse
+import base64
+import datetime
+import fnmatch
+import functools
+import getpass
+import io
+import os
+import os.path
+import re
+import stat
 import sys
-from authenticator.data import ClientData, ClientFile
-from authenticator.hotp import HOTP
+import time
+
+# Deletes whitespace from an entered shared secret. These are the characters
+# str.split() splits on (those for which str.isspace() is True).
+#
+_WS_DELETE = str.maketrans(
+    '', '',
+    '\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680' +
+    '\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a' +
+    '\u2028\u2029\u202f\u205f\u3000')
+
+# Closing paragraph of the 'info' output, already filled to 78 columns
+#
+_ABOUT_ADDENDUM = (
+    "See https://github.com/jenesuispasdave/github/ for the source code" +
+    " repository,\nthe latest version, and technical support.")
+
+# Formatters for the generated codes
+#
+_TIME_BASED_CODE_FMT = "{0}: {1} (expires in {2} seconds)".format
+_COUNTER_BASED_CODE_FMT = "{0}: {1} (for count {2})".format
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_wildcard(pattern):
+    """Compile a wildcard pattern used to match client IDs.
+
+    A pattern without any '*' characters is treated as if there were a '*'
+    at the beginning and end. Only '*' is a wildcard; the other fnmatch
+    special characters ('?' and '[') match literally.
+
+    Args:
+        pattern: the wildcard pattern.
+
+    Returns:
+        The compiled regular expression.
+
+    """
+    if '*' not in pattern:
+        pattern = "*{0}*".format(pattern)
+    pattern = pattern.strip().replace('[', '[[]').replace('?', '[?]')
+    return re.compile(fnmatch.translate(pattern))
 
 
 class DuplicateKeyError(KeyError):
@@ -26,9 +76,179 @@ class DuplicateKeyError(KeyError):
     pass
 
 
+class LazyArgumentParser(argparse.ArgumentParser):
+    """An ArgumentParser that builds its sub-command parsers on demand.
+
+    Each sub-command parser is registered as a thunk with
+    add_lazy_subparser(). When parsing, only the parser for the sub-command
+    named on the command line is built. All of the sub-command parsers are
+    built before any help or usage text is produced, so that text is the
+    same as if every parser had been built up front.
+
+    """
+
+    def __init__(self, *args, **kw_args):
+        """Constructor. Takes the same arguments as ArgumentParser."""
+        super().__init__(*args, **kw_args)
+        self.__subparsers = None
+        self.__thunks = []
+        self.__pending = {}
+
+    def _build_all_subparsers(self):
+        """Build every sub-command parser not yet built."""
+        built = False
+        for names, thunk in self.__thunks:
+            if names[0] in self.__pending:
+                self._build_subparser(names[0])
+                built = True
+        if not built:
+            return
+        # Restore the registration order of the sub-commands, in case some
+        # were built before the others.
+        #
+        order = [name for names, thunk in self.__thunks for name in names]
+        self.__subparsers._choices_actions.sort(
+            key=lambda x: order.index(x.dest))
+        name_parser_map = sorted(
+            self.__subparsers._name_parser_map.items(),
+            key=lambda x: order.index(x[0]))
+        self.__subparsers._name_parser_map.clear()
+        self.__subparsers._name_parser_map.update(name_parser_map)
+
+    def _build_subparser(self, name):
+        """Build the parser for the named sub-command (or alias)."""
+        names, thunk = self.__pending[name]
+        for n in names:
+            del self.__pending[n]
+        thunk(self.__subparsers)
+
+    def _requested_subcommand(self, arg_strings):
+        """Find the sub-command name in the command line arguments.
+
+        Returns:
+            The first positional argument (skipping option values), or None
+            if there are no positional arguments.
+
+        """
+        skip_next = False
+        for arg in arg_strings:
+            if skip_next:
+                skip_next = False
+                continue
+            if arg.startswith('-'):
+                action = self._option_string_actions.get(arg)
+                if action is not None and 0 != action.nargs:
+                    skip_next = True
+                continue
+            return arg
+        return None
+
+    def add_lazy_subparser(self, names, thunk):
+        """Register a thunk that builds a sub-command parser.
+
+        Args:
+            names: a sequence holding the sub-command name followed by
+                any aliases.
+            thunk: a callable that takes the subparsers action and adds the
+                sub-command parser to it.
+
+        """
+        entry = (tuple(names), thunk)
+        self.__thunks.append(entry)
+        for name in entry[0]:
+            self.__pending[name] = entry
+
+    def add_subparsers(self, **kw_args):
+        """Add the sub-command action; sub-commands are plain parsers."""
+        kw_args.setdefault('parser_class', argparse.ArgumentParser)
+        self.__subparsers = super().add_subparsers(**kw_args)
+        return self.__subparsers
+
+    def format_help(self):
+        """Build all sub-command parsers, then format the help text."""
+        self._build_all_subparsers()
+        return super().format_help()
+
+    def format_usage(self):
+        """Build all sub-command parsers, then format the usage text."""
+        self._build_all_subparsers()
+        return super().format_usage()
+
+    def parse_known_args(self, args=None, namespace=None):
+        """Build the needed sub-command parser, then parse the arguments."""
+        if args is None:
+            args = sys.argv[1:]
+        else:
+            args = list(args)
+        name = self._requested_subcommand(args)
+        if name in self.__pending:
+            self._build_subparser(name)
+        elif name is not None:
+            # unknown sub-command; build them all so the error message
+            # lists every valid choice.
+            #
+            self._build_all_subparsers()
+        return super().parse_known_args(args, namespace)
+
+
+class _FilledHelpFormatter(argparse.RawDescriptionHelpFormatter):
+    """A help formatter that fills description and epilog text on demand.
+
+    The text is dedented and each paragraph (paragraphs are separated by a
+    blank line) is filled to CLI._EPILOG_WIDTH columns, but only when help
+    is actually formatted.
+
+    """
+
+    def _fill_text(self, text, width, indent):
+        # textwrap is only needed to format help, so it is imported here
+        # rather than on the start-up path
+        #
+        import textwrap
+
+        # keep any leading line breaks (e.g. group descriptions)
+        #
+        text = textwrap.dedent(text)
+        body = text.lstrip("\n")
+        paragraphs = body.strip().split("\n\n")
+        text = text[:len(text) - len(body)] + "\n\n\n".join(
+            textwrap.fill(paragraph, width=CLI._EPILOG_WIDTH)
+            for paragraph in paragraphs)
+        return super()._fill_text(text, width, indent)
+
+
 class CLI:
     """Command Line Interface."""
 
+    _EPILOG_WIDTH = 78
+    _PATTERN_EPILOG = """
+        By default the clientIdPattern is a wildcard string. The '*'
+        character represents zero or more other characters. A string
+        without any '*' characters is treated as if there were a '*' at
+        the beginning and end (so that specifying 'abc' is the same as
+        specifying '*abc*').
+
+        If the '--regex' option is used then the clientIdPattern is
+        interpreted as a Python regular expression. See
+        http://docs.python.org/3.3/howto/regex.html for documentation on
+        Python regular expressions."""
+
+    # Sub-command aliases and the sub-commands they stand for
+    #
+    _SUBCMD_ALIASES = {'del': 'delete', 'gen': 'generate'}
+    # Names of the methods that execute the sub-commands needing the data
+    # file, and the 'set' commands
+    #
+    _SUBCMD_HANDLERS = {
+        'add': '_execute_add',
+        'delete': '_execute_delete',
+        'generate': '_execute_generate',
+        'list': '_execute_list',
+        'set': '_execute_set'}
+    _SET_HANDLERS = {
+        'passphrase': '_execute_set_passphrase',
+        'clientid': '_execute_set_clientid'}
+
     class RedirectStdStreams:
         """A context manager temporarily redirects the standard streams."""
 
@@ -50,13 +270,11 @@ class CLI:
 
     def __init__(self, stdin=None, stdout=None, stderr=None):
         """Constructor."""
-        import os.path
-        import argparse
-        import textwrap
 
-        self.__iso_fmt = "%Y%m%dT%H%M%S%z"
         self.__std_fmt = "%Y-%m-%d %H:%M:%S %z"
         self.__stdin_redirected = False
+        self.__readline = None
+        self.__stdin_mode = None
         if stdin is not None:
             self.__stdin = stdin
             self.__stdin_redirected = True
@@ -77,39 +295,16 @@ class CLI:
         self.__passphrase = None
         self.__new_passphrase = None
         self.__shared_secret = None
+        self.__hotp = None
         self.__data_dir = self._locate_data_dir()
         self.__data_file = os.path.join(self.__data_dir, 'authenticator.data')
         self.__cf = None
-        self.__re_client_id_pattern = None
-        self.__raw_client_id_pattern = None
+        self.__cds = None
         self.__abandon_cli = False
 
-        epilog_width = 78
-        epilog1 = textwrap.fill(textwrap.dedent(
-            """
-            By default the clientIdPattern is a wildcard string. The '*'
-            character represents zero or more other characters. A string
-            without any '*' characters is treated as if there were a '*' at
-            the beginning and end (so that specifying 'abc' is the same as
-            specifying '*abc*').""").strip(), width=epilog_width)
-        epilog2 = textwrap.fill(textwrap.dedent(
-            """
-            If the '--regex' option is used then the clientIdPattern is
-            interpreted as a Python regular expression. See
-            http://docs.python.org/3.3/howto/regex.html for documentation on
-            Python regular expressions.""").strip(), width=epilog_width)
-        epilog = "\n".join([epilog1, "\n", epilog2])
-        epilog3 = textwrap.fill(textwrap.dedent(
-            """
-            Both the 'oldClientId' and 'newClientId' arguments are exact
-            strings. They are not wildcard or regular expression patterns.
-            Only one HOTP/TOTP configuration can be renamed at a time."""
-            ).strip(),
-            width=epilog_width)
-
         # main command
         #
-        self.parser = argparse.ArgumentParser(
+        self.parser = LazyArgumentParser(
             description="Run or manage HOTP/TOTP calculations",
             prog='authenticator')
         self.parser.add_argument(
@@ -118,19 +313,32 @@ class CLI:
         self.parser.add_argument(
             '--data', dest='altDataFile', action='store',
             help="Specify the path to an alternate data file")
-        subparsers = self.parser.add_subparsers(
+        self.parser.add_subparsers(
             title="Sub-commands", description="\nValid Sub-Commands",
             help="\nSub-command Help")
 
-        # sub-command: add
+        # sub-commands; each parser is built only when needed
         #
+        self.parser.add_lazy_subparser(('add',), self._build_add_parser)
+        self.parser.add_lazy_subparser(
+            ('delete', 'del'), self._build_delete_parser)
+        self.parser.add_lazy_subparser(
+            ('generate', 'gen'), self._build_generate_parser)
+        self.parser.add_lazy_subparser(('info',), self._build_info_parser)
+        self.parser.add_lazy_subparser(('list',), self._build_list_parser)
+        self.parser.add_lazy_subparser(('set',), self._build_set_parser)
+
+    # -------------------------------------------------------------------------+
+    # sub-command parser builders
+    # -------------------------------------------------------------------------+
+
+    def _build_add_parser(self, subparsers):
+        """Build the parser for sub-command 'add'."""
         sp_add = subparsers.add_parser(
             'add',
-            formatter_class=argparse.RawDescriptionHelpFormatter,
+            formatter_class=_FilledHelpFormatter,
             help="add a HOTP/TOTP configuration",
-            description=textwrap.fill(
-                "Add a new HOTP/TOTP configuration to the data file.",
-                width=epilog_width))
+            description="Add a new HOTP/TOTP configuration to the data file.")
         sp_add.add_argument(
             'clientIdToAdd', action='store',
             help="a unique identifier for the HOTP/TOTP configuration")
@@ -147,17 +355,16 @@ class CLI:
             " HOTP calculation (default: 30)")
         sp_add.set_defaults(subcmd='add')
 
-        # sub-command: delete
-        #
+    def _build_delete_parser(self, subparsers):
+        """Build the parser for sub-command 'delete' (alias 'del')."""
         sp_del = subparsers.add_parser(
             'delete', aliases=['del'],
-            formatter_class=argparse.RawDescriptionHelpFormatter,
+            formatter_class=_FilledHelpFormatter,
             help="delete a HOTP/TOTP configuration",
-            epilog=epilog,
-            description=textwrap.fill(
+            epilog=CLI._PATTERN_EPILOG,
+            description=(
                 "Delete one or more HOTP/TOTP configurations from " +
-                "the data file.",
-                width=epilog_width))
+                "the data file."))
         sp_del.add_argument(
             'clientIdPattern', action='store',
             help="wildcard pattern to match the client IDs of one or " +
@@ -170,17 +377,16 @@ class CLI:
             help="Do not ask for confirmation")
         sp_del.set_defaults(subcmd='delete')
 
-        # sub-command: generate
-        #
+    def _build_generate_parser(self, subparsers):
+        """Build the parser for sub-command 'generate' (alias 'gen')."""
         sp_gen = subparsers.add_parser(
             'generate', aliases=['gen'],
-            formatter_class=argparse.RawDescriptionHelpFormatter,
+            formatter_class=_FilledHelpFormatter,
             help="generate passwords for one or more HOTP/TOTP configurations",
-            epilog=epilog,
-            description=textwrap.fill(
+            epilog=CLI._PATTERN_EPILOG,
+            description=(
                 "Generate passwords for one or more HOTP/TOTP " +
-                "configurations from the data file.",
-                width=epilog_width))
+                "configurations from the data file."))
         sp_gen.add_argument(
             'clientIdPattern', action='store', nargs='?', default='',
             help="wildcard pattern to match the client IDs of one or " +
@@ -202,28 +408,26 @@ class CLI:
             " configurations (which are skipped by default).")
         sp_gen.set_defaults(subcmd='generate')
 
-        # sub-command: info
-        #
+    def _build_info_parser(self, subparsers):
+        """Build the parser for sub-command 'info'."""
         sp_info = subparsers.add_parser(
             'info', help="show information about this software and your data",
-            formatter_class=argparse.RawDescriptionHelpFormatter,
-            description=textwrap.fill(
+            formatter_class=_FilledHelpFormatter,
+            description=(
                 "Show software version information, support information, " +
                 "source code location, et cetera. Also show the location " +
-                "of the data file and when it was last modified.",
-                width=epilog_width))
+                "of the data file and when it was last modified."))
         sp_info.set_defaults(subcmd='info')
 
-        # sub-command: list
-        #
+    def _build_list_parser(self, subparsers):
+        """Build the parser for sub-command 'list'."""
         sp_list = subparsers.add_parser(
             'list', help="list HOTP/TOTP configurations",
-            formatter_class=argparse.RawDescriptionHelpFormatter,
-            epilog=epilog,
-            description=textwrap.fill(
+            formatter_class=_FilledHelpFormatter,
+            epilog=CLI._PATTERN_EPILOG,
+            description=(
                 "List one or more HOTP/TOTP configurations from the " +
-                "data file.",
-                width=epilog_width))
+                "data file."))
         sp_list.add_argument(
             'clientIdPattern', action='store', nargs='?', default='',
             help="wildcard pattern to match the client IDs of one or " +
@@ -237,33 +441,33 @@ class CLI:
             help="Show all properties of each configuration; -vv to show more")
         sp_list.set_defaults(subcmd='list')
 
-        # sub-command: set
-        #
+    def _build_set_parser(self, subparsers):
+        """Build the parser for sub-command 'set' and its set commands."""
+        epilog3 = """
+            Both the 'oldClientId' and 'newClientId' arguments are exact
+            strings. They are not wildcard or regular expression patterns.
+            Only one HOTP/TOTP configuration can be renamed at a time."""
+
         sp_set = subparsers.add_parser(
             'set', help="set HOPT configuration values",
-            formatter_class=argparse.RawDescriptionHelpFormatter,
-            description=textwrap.fill(
+            formatter_class=_FilledHelpFormatter,
+            description=(
                 "Set configuration values for one or more HOTP " +
                 "configurations from the data file. NOTE: this feature " +
-                "is not implemented.",
-                width=epilog_width))
+                "is not implemented."))
         setsubparsers = sp_set.add_subparsers(
             title="set commands", description="\nValid set commands",
             help="\nset command help")
         sp_set_passphrase = setsubparsers.add_parser(
             'passphrase',
             help="Change the passphrase",
-            description=textwrap.fill(
-                "Change the passphrase for the data file.",
-                width=epilog_width))
+            description="Change the passphrase for the data file.")
         sp_set_passphrase.set_defaults(subsubcmd='passphrase')
         sp_set_rename = setsubparsers.add_parser(
             'clientid',
             help="Rename a HOTP/TOTP configuration",
             epilog=epilog3,
-            description=textwrap.fill(
-                "Change the client ID for a HOTP/TOTP configuration.",
-                width=epilog_width))
+            description="Change the client ID for a HOTP/TOTP configuration.")
         sp_set_rename.add_argument(
             dest='oldClientId', action='store',
             help="client ID of HOTP/TOTP configuration to be renamed")
@@ -287,18 +491,22 @@ class CLI:
             DuplicateKeyError: There already exists a ClientData object with
                 the same client_id in the data file.
         """
-        import datetime
-
-        cds_existing = self.__cf.load(self.__data_file)
-        for cd_existing in cds_existing:
-            if cd_new.client_id() == cd_existing.client_id():
-                raise DuplicateKeyError("That configuration already exists.")
-        cds_new = cds_existing[:]
-        now = datetime.datetime.now(ClientData.tz())
+        from authenticator.data import ClientData
+
+        cds_existing = self._load_cds()
+        client_id_new = cd_new.client_id()
+        if any(client_id_new == cd_existing.client_id()
+               for cd_existing in cds_existing):
+            raise DuplicateKeyError("That configuration already exists.")
         if not cd_new.counter_from_time():
-            cd_new.set_last_count_update_time(now.strftime(self.__iso_fmt))
-        cds_new.append(cd_new)
-        self.__cf.save(self.__data_file, cds_new)
+            # ClientData formats the timestamp itself
+            #
+            cd_new.set_last_count_update_time(
+                datetime.datetime.now(ClientData.tz()))
+        # the loaded list is ours to modify, so append to it in place
+        #
+        cds_existing.append(cd_new)
+        self._save_cds(cds_existing)
 
     def _apply_alt_data_file_path(self, alt_data_file):
         """Convert the alt_data_file argument to a valid dataDir and dataFile.
@@ -311,8 +519,6 @@ class CLI:
             True if everything is OK; False if there was some kind of error.
 
         """
-        import os.path
-        import os
 
         if alt_data_file is None:
             return False
@@ -328,11 +534,11 @@ class CLI:
         #
         if not os.path.isabs(path):
             path = os.path.abspath(path)
-        # Check to see if it exists. If it does, is it a directory
-        # or a file?
-        if os.path.exists(path):
-            if os.path.isdir(path):
-                adf_is_directory = True
+        # Check to see if it is an existing directory (isdir() is False if
+        # the path does not exist)
+        #
+        if os.path.isdir(path):
+            adf_is_directory = True
         # Assign the dataDir and dataFile
         #
         if adf_is_directory:
@@ -342,6 +548,7 @@ class CLI:
         else:
             self.__data_dir = os.path.dirname(path)
             self.__data_file = path
+        self.__cds = None
         # Get out
         #
         if not os.path.exists(self.__data_dir):
@@ -358,9 +565,9 @@ class CLI:
             is_new: True if capturing a replacement passphrase; otherwise,
                 capturing the initial passphrase.
         """
-        import getpass
 
         infix_prompt = "new " if is_new else ""
+        use_getpass = self._stdin_is_tty() and sys.stdin is self.__stdin
         pp1 = None
         pp2 = None
         first_time = True
@@ -374,8 +581,7 @@ class CLI:
             first_time = False
             # Prompt for new passphrase
             #
-            if (self._stdin_is_tty() and
-                    sys.stdin is self.__stdin):
+            if use_getpass:
                 pp1 = getpass.getpass(
                     "Enter {0}passphrase: ".format(infix_prompt),
                     stream=self.__stdout)
@@ -383,17 +589,16 @@ class CLI:
                 print(
                     "Enter {0}passphrase: ".format(infix_prompt),
                     end="", flush=True, file=self.__stdout)
-                pp1 = self.__stdin.readline()
+                pp1 = self._readline()
             pp1 = pp1.strip()
             # If no passphrase, then get  out
             #
-            if 0 == len(pp1):
+            if not pp1:
                 self.__abandon_cli = True
                 return
             # Prompt to confirm passphrase
             #
-            if (self._stdin_is_tty() and
-                    sys.stdin is self.__stdin):
+            if use_getpass:
                 pp2 = getpass.getpass(
                     "Confirm {0}passphrase: ".format(infix_prompt),
                     stream=self.__stdout)
@@ -401,11 +606,11 @@ class CLI:
                 print(
                     "Confirm {0}passphrase: ".format(infix_prompt),
                     end="", flush=True, file=self.__stdout)
-                pp2 = self.__stdin.readline()
+                pp2 = self._readline()
             pp2 = pp2.strip()
             # If no passphrase, then get  out
             #
-            if 0 == len(pp2):
+            if not pp2:
                 self.__abandon_cli = True
                 return
         # We have matching passphrases
@@ -435,77 +640,41 @@ class CLI:
         deleted_count = 0
         # Load the ClientData objects
         #
-        cds = self.__cf.load(self.__data_file)
-        # Which of them should be delete
+        cds = self._load_cds()
+        # Which of them should be deleted, and which kept
         #
-        cds_to_delete = list(
-            filter(lambda x: self._match_clientid(x, id_pattern), cds))
+        cds_to_keep = []
+        cds_to_delete = []
+        match_clientid = self._match_clientid
+        for cd in cds:
+            if match_clientid(cd, id_pattern):
+                cds_to_delete.append(cd)
+            else:
+                cds_to_keep.append(cd)
         if 0 == len(cds_to_delete):
             # No change, so no need to save the file; just get out
             return deleted_count
-        # Collect just the client IDs of the ClientData objects to
-        # be deleted
-        #
-        client_ids_to_delete = [
-            cd_to_delete.client_id() for cd_to_delete in cds_to_delete]
-        # Confirm each delete, if not quiet
+        # Confirm each delete, if not quiet. Any that are not confirmed
+        # are kept (in their original order).
         #
         if not self.args.quiet:
-            provisional_client_ids = list(
-                filter(
-                    lambda x:
-                    self._confirm_delete(x), client_ids_to_delete))
-            client_ids_to_delete = provisional_client_ids
+            client_ids_to_delete = set(
+                cd.client_id() for cd in cds_to_delete
+                if self._confirm_delete(cd.client_id()))
+            if len(client_ids_to_delete) < len(cds_to_delete):
+                cds_to_keep = [
+                    cd for cd in cds
+                    if cd.client_id() not in client_ids_to_delete]
 
-        # Assemble the list of ClientData objects to keep
-        #
-        cds_to_keep = list(
-            filter(lambda x: x.client_id() not in client_ids_to_delete, cds))
         deleted_count = len(cds) - len(cds_to_keep)
         # Update the file
         #
         if 0 < deleted_count:
-            self.__cf.save(self.__data_file, cds_to_keep)
+            self._save_cds(cds_to_keep)
         # Get out
         #
         return deleted_count
 
-    def _escape_for_re(self, clear_text):
-        """Convert a wildcard string to an regex.
-
-        Convert a wildcard string to a regular expression string,
-        escaping all the regular expression special characters.
-
-        Args:
-            clear_text: a wildcard string. Any '*' will get converted to
-            '.*' patterns in the regular expression; all other characters
-            will match exactly.
-
-        Returns:
-            A regular expression pattern that matches the intent of the
-            clear_text wildcard search string. If input is None or an empty
-            string, then '.*' is the result.
-
-        """
-        # Input validation
-        #
-        if clear_text is None:
-            return '^.*$'
-        wc_text = clear_text.strip()
-        if 0 == len(wc_text):
-            return '^.*$'
-
-        re_text = ['^']
-        for c in wc_text:
-            if '*' == c:
-                re_text.append('.*')
-            elif c in ('.', '^', '$', '+', '?', '\\', '|', '{', '(', '['):
-                re_text.append("\\{0}".format(c))
-            else:
-                re_text.append(c)
-        re_text.append('$')
-        return "".join(re_text)
-
     def _generate_once(self, cds_to_calc):
         """Generate a HOTP for each configuration in cds_to_calc.
 
@@ -520,32 +689,45 @@ class CLI:
             cds_to_calc.
 
         """
+        hotp = self._hotp()
+        stdout = self.__stdout
+        include_counter_based = self.args.includeCounterBasedConfigs
+        # configurations with the same period share the time-based counter,
+        # so compute it once per period rather than once per configuration
+        #
+        time_counters = {}
         expiration_guard = 10**6
         most_recent_expiration = expiration_guard  # pretty big
         for cd in cds_to_calc:
             if cd.counter_from_time():
-                hotp = HOTP()
-                code_string, remaining_seconds = hotp.generate_code_from_time(
+                period = cd.period()
+                time_counter = time_counters.get(period)
+                if time_counter is None:
+                    counter, elapsed_seconds = hotp.counter_from_time(
+                        period=period)
+                    time_counter = (counter, int(period - elapsed_seconds))
+                    time_counters[period] = time_counter
+                counter, remaining_seconds = time_counter
+                code_string = hotp.generate_code_from_counter(
                     cd.shared_secret(),
-                    code_length=cd.password_length(),
-                    period=cd.period())
+                    counter,
+                    code_length=cd.password_length())
                 if remaining_seconds < most_recent_expiration:
                     most_recent_expiration = remaining_seconds
                 print(
-                    "{0}: {1} (expires in {2} seconds)".format(
+                    _TIME_BASED_CODE_FMT(
                         cd.client_id(), code_string, remaining_seconds),
-                    file=self.__stdout)
-            elif self.args.includeCounterBasedConfigs:
-                hotp = HOTP()
+                    file=stdout)
+            elif include_counter_based:
                 code_string = hotp.generate_code_from_counter(
                     cd.shared_secret(),
                     cd.incremented_count(),
                     code_length=cd.password_length())
                 self._update_client_in_data_file(cd)
                 print(
-                    "{0}: {1} (for count {2})".format(
+                    _COUNTER_BASED_CODE_FMT(
                         cd.client_id(), code_string, cd.last_count()),
-                    file=self.__stdout)
+                    file=stdout)
         # Get out
         #
         if expiration_guard == most_recent_expiration:
@@ -564,43 +746,67 @@ class CLI:
                 for counter-based HOTP configurations, which are only
                 calculated once.
         """
-        import time
 
+        stdout = self.__stdout
         # Load the ClientData objects
         #
-        cds = self.__cf.load(self.__data_file)
+        cds = self._load_cds()
         # Which of them should be calculated
         #
-        cds_to_calc = list(
-            filter(lambda x: self._match_clientid(x, id_pattern), cds))
+        match_clientid = self._match_clientid
+        cds_to_calc = [cd for cd in cds if match_clientid(cd, id_pattern)]
         if 0 == len(cds_to_calc):
             # None found; just get out
-            print("No HOTP/TOTP configurations found.", file=self.__stdout)
+            print("No HOTP/TOTP configurations found.", file=stdout)
             return
+        # Resolve the refresh mode once; it is the same for every pass
+        #
+        refresh_once = 'once' == self.args.refresh
+        refresh_at_expiration = 'expiration' == self.args.refresh
+        if not (refresh_once or refresh_at_expiration):
+            refresh_interval = int(self.args.refresh)
         # Calculate the HOTPs
         first_time = True
         keep_going = True
         while keep_going:
             if not first_time:
-                print("", file=self.__stdout)
+                print("", file=stdout)
             first_time = False
             soonest_expiration = self._generate_once(cds_to_calc)
             if soonest_expiration is None:
                 # we only calculate counter-based HOTPs once
                 keep_going = False
-            elif 'once' == self.args.refresh:
+            elif refresh_once:
                 keep_going = False
-            elif 'expiration' == self.args.refresh:
+            elif refresh_at_expiration:
                 time.sleep(soonest_expiration)
             else:
-                time.sleep(self.args.refresh)
+                time.sleep(refresh_interval)
+
+    def _hotp(self):
+        """Get the HOTP object, creating it on first use.
+
+        A HOTP object is not stateless: it remembers the base32 secrets it
+        decoded most recently (and the keyed HMACs for keys used for many
+        codes). So one is shared by every configuration and kept for every
+        generate pass, rather than decoding each secret again.
+
+        Returns:
+            The HOTP object.
+
+        """
+        from authenticator.hotp import HOTP
+
+        if self.__hotp is None:
+            self.__hotp = HOTP()
+        return self.__hotp
 
     def _list_client_data_verbose(self, cd):
         """Verbose display of one ClientData object."""
-        import base64
         import iso8601
 
-        print("id: {0}".format(cd.client_id()), file=self.__stdout)
+        stdout = self.__stdout
+        print("id: {0}".format(cd.client_id()), file=stdout)
         if (1 < self.args.verbose):
             ss = cd.shared_secret()
             if type(b'AB') == type(ss):
@@ -610,52 +816,69 @@ class CLI:
         if cd.counter_from_time():
             print(
                 "time-based; period: {0}".format(cd.period()),
-                file=self.__stdout)
+                file=stdout)
         else:
             print(
                 "counter-based; last counter: {0}".format(
                     cd.last_count()),
-                file=self.__stdout)
+                file=stdout)
             t = iso8601.parse_date(cd.last_count_update_time())
             print(
                 "count updated: {0}".format(
                     t.strftime(self.__std_fmt)),
-                file=self.__stdout)
+                file=stdout)
         print(
             "password length: {0}".format(cd.password_length()),
-            file=self.__stdout)
+            file=stdout)
         if 0 < len(cd.tags()):
             print(
                 "tags: {0}".format(", ".join(cd.tags())),
-                file=self.__stdout)
+                file=stdout)
         if 0 < len(cd.note()):
             print(
                 "note: {0}".format(", ".join(cd.note())),
-                file=self.__stdout)
+                file=stdout)
 
     def _list_client_data(self, id_pattern='*'):
         """Display the ClientData objects for all configurations."""
         # TODO: [DTH] add wild card filtering
 
-        cds = self.__cf.load(self.__data_file)
-        cds_to_list = list(
-            filter(lambda x: self._match_clientid(x, id_pattern), cds))
+        stdout = self.__stdout
+        verbose = self.args.verbose
+        cds = self._load_cds()
+        match_clientid = self._match_clientid
+        cds_to_list = [cd for cd in cds if match_clientid(cd, id_pattern)]
         if 0 == len(cds_to_list):
-            print("No HOTP/TOTP configurations found.", file=self.__stdout)
+            print("No HOTP/TOTP configurations found.", file=stdout)
         first_time = True
         for cd in cds_to_list:
             if first_time:
                 # add a blank line to separate list from passphrase prompt
-                print("", file=self.__stdout)
-            if 0 < self.args.verbose:
+                print("", file=stdout)
+            if 0 < verbose:
                 if not first_time:
                     # add a blank line between clients
-                    print("", file=self.__stdout)
+                    print("", file=stdout)
                 self._list_client_data_verbose(cd)
             else:
-                print("{0}".format(cd.client_id()), file=self.__stdout)
+                print("{0}".format(cd.client_id()), file=stdout)
             first_time = False
 
+    def _load_cds(self):
+        """Get the ClientData objects from the data file.
+
+        The data file is decrypted and parsed only on the first call; later
+        calls return the same list, which _save_cds() keeps current.
+
+        Returns:
+            The list of ClientData objects. Callers may modify it, but
+            must then save it with _save_cds().
+
+        """
+        if self.__cds is None:
+            self.__cds = self.__cf.load(self.__data_file)
+        return self.__cds
+
     def _locate_data_dir(self):
         """Find the default location of the data file.
 
@@ -665,19 +888,23 @@ class CLI:
 
         On other Unix systems, this is "~/.authenticator/".
         """
-        import os
-        import os.path
 
         root_seed = "~"
         root = os.path.expanduser(root_seed)
         root = os.path.join(root, ".authenticator")
         if root_seed == root:
             raise SystemExit("Could not expand the path '~/.authenticator'")
-        if not os.path.exists(root):
+        # Create it if missing; one syscall whether or not it exists
+        #
+        try:
             os.mkdir(root, mode=0o755)
+        except FileExistsError:
+            pass
         return root
 
     def _make_client_data(self):
+        from authenticator.data import ClientData
+
         cd_args = {
             'clientId': self.args.clientIdToAdd,
             'sharedSecret': self.__shared_secret
@@ -703,18 +930,14 @@ class CLI:
             True if the cd.client_id() matches the pattern; otherwise, False.
 
         """
-        import re
-
         if '*' == pattern:
             return True
-        if pattern != self.__raw_client_id_pattern:
-            self.__raw_client_id_pattern = pattern
-            if '*' not in pattern:
-                expression = self._escape_for_re("*{0}*".format(pattern))
-            else:
-                expression = self._escape_for_re(pattern)
-            self.__re_client_id_pattern = re.compile(expression)
-        if self.__re_client_id_pattern.match(cd.client_id()) is not None:
+        if '*' not in pattern:
+            # no wildcards means match anywhere in the client ID, which is
+            # just a substring test; no need for a regular expression
+            #
+            return pattern in cd.client_id()
+        if _compile_wildcard(pattern).match(cd.client_id()) is not None:
             return True
         return False
 
@@ -735,6 +958,8 @@ class CLI:
             A new ClientData object with updated properties.
 
         """
+        from authenticator.data import ClientData
+
         cd_args = {
             'clientId': old_cd.client_id(),
             'sharedSecret': old_cd.shared_secret(),
@@ -759,8 +984,9 @@ class CLI:
         the data file.
 
         """
-        import getpass
+        from authenticator.data import ClientFile
 
+        use_getpass = self._stdin_is_tty() and sys.stdin is self.__stdin
         pp = None
         first_time = True
         while self.__passphrase is None:
@@ -771,19 +997,18 @@ class CLI:
             # Capture the passphrase
             #
             first_time = False
-            if (self._stdin_is_tty() and
-                    sys.stdin is self.__stdin):
+            if use_getpass:
                 pp = getpass.getpass(
                     "Enter passphrase: ", stream=self.__stdout)
             else:
                 print(
                     "Enter passphrase: ",
                     end="", flush=True, file=self.__stdout)
-                pp = self.__stdin.readline().strip()
+                pp = self._readline().strip()
             pp = pp.strip()
             # If no passphrase, then get out
             #
-            if 0 == len(pp):
+            if not pp:
                 self.__abandon_cli = True
                 return
             # Verify the passphrase
@@ -794,16 +1019,18 @@ class CLI:
                 self.__cf = cf
 
     def _query_shared_secret(self):
+        from authenticator.hotp import HOTP
+
         while self.__shared_secret is None:
             print(
                 "Enter shared secret: ",
                 end="", flush=True, file=self.__stdout)
-            ss = self.__stdin.readline().strip()
-            if 0 == len(ss):
+            ss = self._readline().strip()
+            if not ss:
                 self.__abandon_cli = True
                 return
             # remote whitespace and make uppercase
-            ss = "".join(ss.split()).upper()
+            ss = ss.translate(_WS_DELETE).upper()
             hotp = HOTP()
             try:
                 hotp.convert_base32_secret_key(ss)
@@ -830,22 +1057,48 @@ class CLI:
         prompt = "{0} ({1}) [{2}]: ".format(
             prompt_statement, "|".join(possible_values),
             possible_values[default_value_index])
-        print(prompt, end="", flush=True, file=self.__stdout)
-        r = self.__stdin.readline().strip()
-        if 0 == len(r):
+        # the prompt is written on every retry, so write it directly
+        #
+        write_stdout = self.__stdout.write
+        flush_stdout = self.__stdout.flush
+        write_stdout(prompt)
+        flush_stdout()
+        r = self._readline().strip()
+        if not r:
             r = possible_values[default_value_index]
         while r not in possible_values:
             print(
                 "Bad input. Please respond with one of: {0}".format(
                     ", ".join(possible_values)),
                 file=self.__stdout)
-            print(prompt, end="", flush=True, file=self.__stdout)
-            r = self.__stdin.readline().strip()
+            write_stdout(prompt)
+            flush_stdout()
+            r = self._readline().strip()
 
-            if 0 == len(r):
+            if not r:
                 r = possible_values[default_value_index]
         return r
 
+    def _readline(self):
+        """Read a line of input.
+
+        When the input is the process stdin redirected from a regular file,
+        the whole file is read on the first call and the lines are served
+        from memory after that; otherwise each call reads from stdin.
+
+        Returns:
+            The next line, including the line ending; an empty string
+            at end of input.
+
+        """
+        if self.__readline is None:
+            readline = self.__stdin.readline
+            if (sys.stdin is self.__stdin and
+                    stat.S_ISREG(self._stdin_mode())):
+                readline = io.StringIO(self.__stdin.read()).readline
+            self.__readline = readline
+        return self.__readline()
+
     def _rewrite_data(self):
         """Rewrite the data file with the new passphrase.
 
@@ -854,8 +1107,7 @@ class CLI:
         """
         if self.__new_passphrase is None:
             raise AssertionError("No new passphrase; nothing to do")
-        cds = self.__cf.load(self.__data_file)
-        self.__cf.save(self.__data_file, cds, self.__new_passphrase)
+        self._save_cds(self._load_cds(), self.__new_passphrase)
 
     def _rename_client_id(self, old_client_id, new_client_id):
         """Change the client id for an existing HOTP configuration.
@@ -865,15 +1117,15 @@ class CLI:
             made.
 
         """
-        import re
-
-        cds_old = self.__cf.load(self.__data_file)
+        # oldClientId is validated to have no wildcards, so it is an
+        # exact client ID
+        #
+        old_client_id = old_client_id.strip()
+        cds_old = self._load_cds()
         cds_new = []
-        expression = self._escape_for_re(old_client_id)
-        re_old_client_id = re.compile(expression)
         found_id = False
         for cd in cds_old:
-            if re_old_client_id.match(cd.client_id()) is not None:
+            if old_client_id == cd.client_id():
                 found_id = True
                 cd_new = self._modify_client_data(cd, clientId=new_client_id)
                 cds_new.append(cd_new)
@@ -884,9 +1136,22 @@ class CLI:
                 "No configuration found with client ID '{0}'".format(
                     old_client_id), file=self.__stderr)
             return False
-        self.__cf.save(self.__data_file, cds_new)
+        self._save_cds(cds_new)
         return True
 
+    def _save_cds(self, cds, new_passphrase=None):
+        """Store the ClientData objects in the data file.
+
+        Args:
+            cds: The list of ClientData objects to store. It becomes the
+                list returned by later _load_cds() calls.
+            new_passphrase: If not None, the passphrase to encrypt the
+                data file with from now on.
+
+        """
+        self.__cf.save(self.__data_file, cds, new_passphrase)
+        self.__cds = cds
+
     def _show_info(self):
         """Show 'about' information for this software.
 
@@ -896,7 +1161,6 @@ class CLI:
         Also show the location of the data file and when it was last modified.
 
         """
-        import textwrap
         import authenticator
 
         print("authenticator version {0}".format(
@@ -908,12 +1172,7 @@ class CLI:
         print(
             "\nData file location: {0}".format(self.__data_file),
             file=self.__stdout)
-        addendum = textwrap.fill(textwrap.dedent(
-            """
-            See https://github.com/jenesuispasdave/github/ for the source code
-            repository, the latest version, and technical support.""").strip(),
-            width=78)
-        print("\n{0}".format(addendum), file=self.__stdout)
+        print("\n{0}".format(_ABOUT_ADDENDUM), file=self.__stdout)
 
     def _show_version(self):
         """Show the version only.
@@ -926,6 +1185,12 @@ class CLI:
         print("authenticator version {0}".format(
             authenticator.__version__), file=self.__stdout)
 
+    def _stdin_mode(self):
+        """Get the file mode of the process stdin; fstat() is called once."""
+        if self.__stdin_mode is None:
+            self.__stdin_mode = os.fstat(0).st_mode
+        return self.__stdin_mode
+
     def _stdin_is_tty(self):
         """Detect whether the stdin is mapped to a terminal console.
 
@@ -933,10 +1198,7 @@ class CLI:
         http://stackoverflow.com/questions/13442574/how-do-i-determine-if-sys-stdin-is-redirected-from-a-file-vs-piped-from-another
 
         """
-        import os
-        import stat
-
-        mode = os.fstat(0).st_mode
+        mode = self._stdin_mode()
         if ((not stat.S_ISFIFO(mode)) and  # piped
                 (not stat.S_ISREG(mode))):  # redirected
             return True
@@ -945,14 +1207,15 @@ class CLI:
             return False
 
     def _update_client_in_data_file(self, cd):
-        changed = False
-        cds = self.__cf.load(self.__data_file)
-        for i in range(0, len(cds)):
-            if cd.client_id() == cds[i].client_id():
+        client_id = cd.client_id()
+        cds = self._load_cds()
+        # client IDs are unique, so stop at the first match
+        #
+        for i, cd_existing in enumerate(cds):
+            if client_id == cd_existing.client_id():
                 cds[i] = cd
-                changed = True
-        if changed:
-            self.__cf.save(self.__data_file, cds)
+                self._save_cds(cds)
+                break
 
     def _validate_args_add(self):
         """Validate the arguments for the CLI subcommand add."""
@@ -984,7 +1247,7 @@ class CLI:
 
     def _validate_args_missing_subcmd(self):
         """Validate the arguments for the CLI if no subcmd."""
-        if 'alt_data_file' in dir(self.args):
+        if hasattr(self.args, 'alt_data_file'):
             self.parser.error(
                 "missing subcommand (choose from 'add', 'delete', " +
                 "'del', 'generate', 'gen', 'info', 'list', 'set')")
@@ -1000,7 +1263,7 @@ class CLI:
         # if '--version' specified, ignore remainder of command line
         #
         if self.args.showVersion:
-            if 'subcmd' in dir(self.args):
+            if hasattr(self.args, 'subcmd'):
                 self.args.subcmd = None
                 return
 
@@ -1010,14 +1273,12 @@ class CLI:
             self._validate_args_data_file()
         # check subcommands and arguments
         #
-        if 'subcmd' not in dir(self.args):
+        if not hasattr(self.args, 'subcmd'):
             self._validate_args_missing_subcmd()
             return
 
-        if 'del' == self.args.subcmd:
-            self.args.subcmd = 'delete'
-        elif 'gen' == self.args.subcmd:
-            self.args.subcmd = 'generate'
+        self.args.subcmd = CLI._SUBCMD_ALIASES.get(
+            self.args.subcmd, self.args.subcmd)
 
         if 'add' == self.args.subcmd:
             self._validate_args_add()
@@ -1037,11 +1298,11 @@ class CLI:
         Otherwise accept and confirm the passphrase.
 
         """
-        import os.path
+        from authenticator.data import ClientFile
 
         if self.__abandon_cli:
             return
-        if 'subcmd' not in dir(self.args):
+        if not hasattr(self.args, 'subcmd'):
             return
         if 'info' == self.args.subcmd:
             return
@@ -1071,7 +1332,7 @@ class CLI:
             self._capture_passphrase()
             if self.__passphrase is not None:
                 self.__cf = ClientFile(self.__passphrase)
-                self.__cf.save(self.__data_file, [])
+                self._save_cds([])
         else:
             self.__abandon_cli = True
 
@@ -1094,13 +1355,12 @@ class CLI:
         """Prompt for passphrase and, if an 'add', the shared secret."""
         if self.__abandon_cli:
             return
-        if 'subcmd' not in dir(self.args):
+        if not hasattr(self.args, 'subcmd'):
             return
 
         # Get the passphrase, if needed for this subcommand
         #
-        if self.args.subcmd in (
-                'add', 'delete', 'generate', 'list', 'set'):
+        if self.args.subcmd in CLI._SUBCMD_HANDLERS:
             self._query_passphrase()
             if self.__passphrase is None:
                 return
@@ -1151,40 +1411,40 @@ class CLI:
         """Execute the list action."""
         self._list_client_data(self.args.clientIdPattern)
 
-    def _execute_set(self):
-        """Execute the set action."""
-        if 'passphrase' == self.args.subsubcmd:
-            self._rewrite_data()
+    def _execute_set_clientid(self):
+        """Execute the set clientid action."""
+        change_made = self._rename_client_id(
+            self.args.oldClientId, self.args.newClientId)
+        if change_made:
             print("OK", file=self.__stdout)
-        if 'clientid' == self.args.subsubcmd:
-            change_made = self._rename_client_id(
-                self.args.oldClientId, self.args.newClientId)
-            if change_made:
-                print("OK", file=self.__stdout)
-            else:
-                print("Nothing changed.", file=self.__stdout)
         else:
+            print("Nothing changed.", file=self.__stdout)
+
+    def _execute_set_passphrase(self):
+        """Execute the set passphrase action."""
+        self._rewrite_data()
+        print("OK", file=self.__stdout)
+
+    def _execute_set(self):
+        """Execute the set action."""
+        handler = CLI._SET_HANDLERS.get(self.args.subsubcmd)
+        if handler is None:
             print(
                 "'set {0}' is not implemented.".format(
                     self.args.subsubcmd),
                 file=self.__stdout)
+            return
+        getattr(self, handler)()
 
     def _execute_subcmd(self):
         """Execute the subcmd (that needs file access)."""
-        if 'add' == self.args.subcmd:
-            self._execute_add()
-        elif 'delete' == self.args.subcmd:
-            self._execute_delete()
-        elif 'generate' == self.args.subcmd:
-            self._execute_generate()
-        elif 'list' == self.args.subcmd:
-            self._execute_list()
-        elif 'set' == self.args.subcmd:
-            self._execute_set()
-        else:
+        handler = CLI._SUBCMD_HANDLERS.get(self.args.subcmd)
+        if handler is None:
             print(
                 "'{0}' is not implemented.".format(self.args.subcmd),
                 file=self.__stdout)
+            return
+        getattr(self, handler)()
 
     def execute(self):
         """execute the requested actions."""
@@ -1195,16 +1455,15 @@ class CLI:
             self._show_version()
             return
 
-        if self.args.subcmd not in (
-                'add', 'delete', 'generate', 'info', 'list', 'set'):
+        if ('info' != self.args.subcmd and
+                self.args.subcmd not in CLI._SUBCMD_HANDLERS):
             print(
                 "'{0}' is not implemented.".format(self.args.subcmd),
                 file=self.__stdout)
             return
 
         if 'set' == self.args.subcmd:
-            if self.args.subsubcmd not in (
-                    'passphrase', 'clientid'):
+            if self.args.subsubcmd not in CLI._SET_HANDLERS:
                 print(
                     "'set {0}' is not implemented.".format(
                         self.args.subsubcmd),
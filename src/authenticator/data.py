@@ -14,11 +14,40 @@ This implementation requires:
     * cryptography 1.3 or later (see https://cryptography.io/en/latest/)
     * python-dateutil 2.1 or later
         (see https://pypi.python.org/pypi/python-dateutil/2.1)
-    * six 1.10 or later (https://pypi.python.org/pypi/six/1.10.0)
 
 """
 
 import json
+import mmap
+import os
+import struct
+from datetime import datetime, timezone
+from functools import lru_cache
+from hashlib import sha256
+
+import iso8601
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+# orjson is optional; when it is installed it is used to parse the data
+# file
+#
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# The cryptography backend does not change, so get it once
+#
+_BACKEND = default_backend()
+
+# PKCS7 padding, indexed by the number of padding bytes needed
+#
+_PKCS7_PADDING = tuple(bytes((n,)) * n for n in range(17))
+
+# The file header: magic number, file version, key stretches, magic number
+#
+_HEADER = struct.Struct("!IIII")
 
 
 class DecryptionError(Exception):
@@ -33,8 +62,104 @@ class FileCorruptionError(Exception):
     pass
 
 
+def _format_timestamp(t):
+    """Format a datetime in the "%Y%m%dT%H%M%S%z" ISO basic format.
+
+    Unlike strftime(), always zero-pads the year to four digits (on some
+    systems, e.g. Debian, %Y doesn't).
+
+    Args:
+        t: the datetime object; if it has no timezone then the result
+            has no UTC offset.
+
+    Returns:
+        The timestamp string, e.g. "20130704T131415-0500".
+
+    """
+    offset = t.utcoffset()
+    if offset is None:
+        tz = ""
+    else:
+        sign = "+"
+        if 0 > offset.days:
+            sign = "-"
+            offset = -offset
+        hours, minutes = divmod(offset.days * 1440 + offset.seconds // 60, 60)
+        tz = "{0}{1:02d}{2:02d}".format(sign, hours, minutes)
+    return "{0:04d}{1:02d}{2:02d}T{3:02d}{4:02d}{5:02d}{6}".format(
+        t.year, t.month, t.day, t.hour, t.minute, t.second, tz)
+
+
+@lru_cache(maxsize=1024)
+def _normalize_timestamp(s):
+    """Parse an ISO 8601 timestamp string and reformat it.
+
+    The data file holds many copies of a few distinct timestamps, so the
+    results are cached.
+
+    Args:
+        s: the timestamp string; if it has no UTC offset then UTC is
+            assumed.
+
+    Returns:
+        The timestamp string in the "%Y%m%dT%H%M%S%z" ISO basic format.
+
+    """
+    t = iso8601.parse_date(s)
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=timezone.utc)
+    return _format_timestamp(t)
+
+
+def _client_data_from_json(o):
+    """Convert a decoded data file document to ClientData objects.
+
+    Args:
+        o: The decoded JSON document; a list of dictionaries, or None.
+
+    Returns:
+        The list with each dictionary that represents a ClientData object
+        replaced by that ClientData object; None if o is None.
+
+    """
+    if o is None:
+        return None
+    return [
+        ClientData(**d) if isinstance(d, dict) and 'clientId' in d else d
+        for d in o]
+
+
+def _parse_json(b):
+    """Parse the JSON document of a data file.
+
+    Uses orjson when it is installed. orjson rejects raw control characters
+    in strings, which the standard library parser accepts with strict=False
+    (because the notes attribute might contain line feeds); so when orjson
+    fails, the standard library parser gets a second try.
+
+    Args:
+        b: The UTF-8 encoded JSON document; a bytes-like object.
+
+    Returns:
+        The decoded JSON document, as plain lists and dictionaries.
+
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(b)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(str(b, 'utf-8'), strict=False)
+
+
 class ClientDataDecoder(json.JSONDecoder):
-    """A JSONDecoder that recognizes ClientData objects in a JSON string."""
+    """A JSONDecoder that recognizes ClientData objects in a JSON string.
+
+    ClientFile.load() does not use this decoder; it builds the ClientData
+    objects after parsing. It remains for other code that decodes
+    ClientData JSON.
+
+    """
 
     def __init__(self, **kw_args):
         """Compose the standard JSONDecoder with a custom object_hook.
@@ -110,7 +235,7 @@ class ClientDataEncoder(json.JSONEncoder):
         ClassData then invoke the superclass default() method.
 
         """
-        if (ClientData.__name__ == o.__class__.__name__):
+        if isinstance(o, ClientData):
             return o.to_dict()
         else:
             return json.JSONEncoder.default(self, o)
@@ -122,8 +247,11 @@ class ClientData:
     # -------------------------------------------------------------------------+
     # class attributes
     # -------------------------------------------------------------------------+
+    __slots__ = (
+        '__client_id', '__shared_secret', '__counter_from_time',
+        '__last_count', '__last_count_update_time', '__period',
+        '__password_length', '__tags', '__note')
     __tz = None
-    __utz = None
 
     # -------------------------------------------------------------------------+
     # static methods
@@ -132,49 +260,19 @@ class ClientData:
     @staticmethod
     def utz():
         """UTC time zone."""
-        from datetime import timezone, timedelta
 
-        if ClientData.__utz is None:
-            ClientData.__utz = timezone(timedelta(0))
-        return ClientData.__utz
+        return timezone.utc
 
     @staticmethod
     def tz():
         """Local time zone."""
-        from datetime import datetime, timezone, timedelta
 
         if ClientData.__tz is None:
-            # figure the local timezone
-            #
-            lt = datetime.now()
-            ut = datetime.utcnow()
-            lt2 = datetime.now()
-            if ut.second == lt2.second:
-                lt = lt2
-
-            # Strip off the microseconds, or the deltatime won't be in
-            # round seconds
-            #
-            lt = datetime(
-                lt.year, lt.month, lt.day, lt.hour, lt.minute, lt.second)
-            ut = datetime(
-                ut.year, ut.month, ut.day, ut.hour, ut.minute, ut.second)
-
-            # Get UTC offset as a timedelta object
-            #
-            dt = ut - lt
-
-            # Get UTC offset in minutes
+            # Convert the current UTC time to local time, and use the
+            # resulting UTC offset as the local timezone
             #
-            offset_minutes = 0
-            if (0 == dt.days):
-                offset_minutes = dt.seconds // 60
-            else:
-                dt = lt - ut
-                offset_minutes = dt.seconds // 60
-                offset_minutes *= -1
-            dt = timedelta(minutes=offset_minutes)
-            ClientData.__tz = timezone(dt)
+            local_now = datetime.now(timezone.utc).astimezone()
+            ClientData.__tz = timezone(local_now.utcoffset())
 
         return ClientData.__tz
 
@@ -182,125 +280,12 @@ class ClientData:
     # insternal methods
     # ------------------------------------------------------------------------+
 
-    def _init_client_id(self, kw_args):
-        """Process kw_arg client_id."""
-        if 'clientId' not in kw_args:
-            raise ValueError("Need a clientId string.")
-        self.__client_id = kw_args['clientId']
-        if not isinstance(self.__client_id, str):
-            raise TypeError("clientId must be a string.")
-        if 0 == len(self.__client_id):
-            raise ValueError("clientId must be a non-empty string.")
-
-    def _init_shared_secret(self, kw_args):
-        """Process kw_arg shared_secret."""
-        if 'sharedSecret' not in kw_args:
-            raise ValueError("Need a sharedSecret string.")
-        self.__shared_secret = kw_args['sharedSecret']
-        if not ((isinstance(self.__shared_secret, str)) or
-                (isinstance(self.__shared_secret, bytes))):
-            raise TypeError(
-                "sharedSecret must be a string or byte string.")
-        if 0 == len(self.__shared_secret):
-            raise ValueError(
-                "sharedSecret must be a non-empty string or byte string.")
-
-    def _init_counter_from_time(self, kw_args):
-        """Process kw_arg counter_from_time."""
-        self.__counter_from_time = True
-        if 'counterFromTime' in kw_args:
-            if not kw_args['counterFromTime']:
-                self.__counter_from_time = False
-
-    def _init_last_count(self, kw_args):
-        """Process kw_arg last_count."""
-        self.__last_count = 0
-        if 'lastCount' in kw_args:
-            self.__last_count = int(kw_args['lastCount'])
-        if 0 > self.__last_count:
-            raise ValueError(
-                "lastCount must be zero or a positive integer")
-
-    def _init_last_count_update_time(self, kw_args):
-        """Process kw_arg kw_arg last_count_update_time."""
-        from datetime import datetime
-        import iso8601
-
-        self.__last_count_update_time = datetime(
-            1, 1, 1, 0, 0, 0, 0, ClientData.utz()).strftime(self._isoFmt)
-        # Fix issue on some systems, e.g. Debian, where %Y doesn't zero-pad
-        if self.__last_count_update_time[0:3] != "000":
-            self.__last_count_update_time = "000" + \
-                self.__last_count_update_time
-        if 'lastCountUpdateTime' in kw_args:
-            t = datetime.min
-            v = kw_args['lastCountUpdateTime']
-            if isinstance(v, datetime):
-                t = v
-            elif isinstance(v, str):
-                t = iso8601.parse_date(v)
-            else:
-                raise TypeError(
-                    "lastCountUpdateTime must be datetime object"
-                    " or a datetime string")
-            if t.tzinfo is None:
-                t = t.replace(tzinfo=ClientData.utz())
-            self.__last_count_update_time = t.strftime(self._isoFmt)
-            # Fix issue on some systems, e.g. Debian, where %Y doesn't zero-pad
-            tpadding = ""
-            if 10 > t.year:
-                tpadding = "000"
-            elif 100 > t.year:
-                tpadding = "00"
-            elif 1000 > t.year:
-                tpadding = "0"
-            if "0" != self.__last_count_update_time[0:1]:
-                self.__last_count_update_time = tpadding + \
-                    self.__last_count_update_time
-
-    def _init_period(self, kw_args):
-        """Process kw_arg period."""
-        self.__period = 30
-        if 'period' in kw_args:
-            p = int(kw_args['period'])
-            if (0 >= p):
-                raise ValueError("period must be a positive integer")
-            self.__period = p
-
-    def _init_password_length(self, kw_args):
-        """Process kw_arg password_length."""
-        self.__password_length = 6
-        if 'passwordLength' in kw_args:
-            pwd_len = int(kw_args['passwordLength'])
-            if ((1 > pwd_len) or (10 < pwd_len)):
-                raise ValueError("passwordLength must be in the range [1,10]")
-            self.__password_length = pwd_len
-
-    def _init_tags(self, kw_args):
-        """Process kw_arg tags."""
-        self.__tags = []
-        if 'tags' in kw_args:
-            if (isinstance(kw_args['tags'], tuple) or
-                    isinstance(kw_args['tags'], list)):
-                for tag in kw_args['tags']:
-                    if not isinstance(tag, str):
-                        raise TypeError(
-                            "tags must be a sequence of string values")
-                    if 0 < len(tag):
-                        self.__tags.append(tag)
-            elif isinstance(kw_args['tags'], str):
-                if 0 < len(kw_args['tags']):
-                    self.__tags.append(kw_args['tags'])
-            else:
-                raise TypeError("tags must be a sequence of string values")
-
-    def _init_note(self, kw_args):
-        """Process kw_arg note."""
-        self.__note = ""
-        if 'note' in kw_args:
-            if not isinstance(kw_args['note'], str):
-                raise TypeError("note must be a string")
-            self.__note = kw_args['note']
+    def _comparison_key(self):
+        """Get a tuple of all the properties, for equality tests."""
+        return (
+            self.__client_id, self.__shared_secret, self.__counter_from_time,
+            self.__last_count, self.__last_count_update_time, self.__period,
+            self.__password_length, self.__tags, self.__note)
 
     # ------------------------------------------------------------------------+
     # dunder methods
@@ -340,71 +325,105 @@ class ClientData:
                 combination can be supplied.
 
         """
-        self._isoFmt = "%Y%m%dT%H%M%S%z"
-
-        self._init_client_id(kw_args)
-        self._init_shared_secret(kw_args)
-        self._init_counter_from_time(kw_args)
-        self._init_last_count(kw_args)
-        self._init_last_count_update_time(kw_args)
-        self._init_period(kw_args)
-        self._init_password_length(kw_args)
-        self._init_tags(kw_args)
-        self._init_note(kw_args)
+        if 'clientId' not in kw_args:
+            raise ValueError("Need a clientId string.")
+        client_id = kw_args['clientId']
+        if not isinstance(client_id, str):
+            raise TypeError("clientId must be a string.")
+        if not client_id:
+            raise ValueError("clientId must be a non-empty string.")
+        self.__client_id = client_id
+
+        if 'sharedSecret' not in kw_args:
+            raise ValueError("Need a sharedSecret string.")
+        shared_secret = kw_args['sharedSecret']
+        if not isinstance(shared_secret, (str, bytes)):
+            raise TypeError(
+                "sharedSecret must be a string or byte string.")
+        if not shared_secret:
+            raise ValueError(
+                "sharedSecret must be a non-empty string or byte string.")
+        self.__shared_secret = shared_secret
+
+        self.__counter_from_time = bool(kw_args.get('counterFromTime', True))
+
+        last_count = int(kw_args.get('lastCount', 0))
+        if 0 > last_count:
+            raise ValueError(
+                "lastCount must be zero or a positive integer")
+        self.__last_count = last_count
+
+        if 'lastCountUpdateTime' in kw_args:
+            update_time = kw_args['lastCountUpdateTime']
+        else:
+            update_time = datetime(1, 1, 1, 0, 0, 0, 0, ClientData.utz())
+        if isinstance(update_time, str):
+            self.__last_count_update_time = _normalize_timestamp(update_time)
+        else:
+            if not isinstance(update_time, datetime):
+                raise TypeError(
+                    "lastCountUpdateTime must be datetime object"
+                    " or a datetime string")
+            if update_time.tzinfo is None:
+                update_time = update_time.replace(tzinfo=ClientData.utz())
+            self.set_last_count_update_time(update_time)
+
+        period = int(kw_args.get('period', 30))
+        if (0 >= period):
+            raise ValueError("period must be a positive integer")
+        self.__period = period
+
+        pwd_len = int(kw_args.get('passwordLength', 6))
+        if ((1 > pwd_len) or (10 < pwd_len)):
+            raise ValueError("passwordLength must be in the range [1,10]")
+        self.__password_length = pwd_len
+
+        tags = kw_args.get('tags', ())
+        if isinstance(tags, str):
+            tags = (tags,)
+        elif not isinstance(tags, (tuple, list)):
+            raise TypeError("tags must be a sequence of string values")
+        for tag in tags:
+            if not isinstance(tag, str):
+                raise TypeError(
+                    "tags must be a sequence of string values")
+        self.__tags = [tag for tag in tags if tag]
+
+        note = kw_args.get('note', "")
+        if not isinstance(note, str):
+            raise TypeError("note must be a string")
+        self.__note = note
 
     def __str__(self):
         """Stringify this object."""
-        result = []
-        result.append("client_id: '{0}'".format(self.__client_id))
-        result.append("shared_secret: '{0}'".format(self.__shared_secret))
-        result.append(
-            "counter_from_time: {0}".format(self.__counter_from_time))
-        result.append("last_count: {0}".format(self.__last_count))
-        result.append("last_count_update_time: {0}".format(
-            self.__last_count_update_time))
-        result.append("period: {0}".format(self.__period))
-        result.append("password_length: {0}".format(self.__password_length))
-        result.append("tags: {0}".format(self.__tags))
-        result.append("note: \"\"\"{0}\"\"\"".format(self.__note))
-        return "\n".join(result)
+        return (
+            "client_id: '{0}'\n"
+            "shared_secret: '{1}'\n"
+            "counter_from_time: {2}\n"
+            "last_count: {3}\n"
+            "last_count_update_time: {4}\n"
+            "period: {5}\n"
+            "password_length: {6}\n"
+            "tags: {7}\n"
+            "note: \"\"\"{8}\"\"\"").format(
+                self.__client_id, self.__shared_secret,
+                self.__counter_from_time, self.__last_count,
+                self.__last_count_update_time, self.__period,
+                self.__password_length, self.__tags, self.__note)
 
     def __eq__(self, other):
         """Whether this object is equal to the other."""
-        if type(self) != type(other):
+        if type(self) is not type(other):
             return False
-        s_vars = vars(self)
-        o_vars = vars(other)
-        for v in vars(self):
-            if s_vars[v] != o_vars[v]:
-                print("unequal property {0}\n".format(v))
-                if v.endswith("last_count_update_time"):
-                    print("self: {0}\n".format(s_vars[v]))
-                    print("othr: {0}\n".format(o_vars[v]))
-                return False
-        return True
-
-    def __ne__(self, other):
-        """Whether this object is not equal to the other."""
-        if type(self) != type(other):
-            return True
-        s_vars = vars(self)
-        o_vars = vars(other)
-        for v in vars(self):
-            if s_vars[v] != o_vars[v]:
-                return True
-        return False
+        return self._comparison_key() == other._comparison_key()
 
     def __repr__(self):
         """Canonical string representation of this object."""
-        result = []
-        result.append(
-            "ClientData(client_id='{0}',".format(self.__client_id))
-        result.append(
-            "shared_secret='{0}',".format(self.__shared_secret))
-        result.append(
-            "last_count_update_time='{0}')".format(
-                self.__last_count_update_time))
-        return ' '.join(result)
+        return (
+            "ClientData(client_id='{0}', shared_secret='{1}',"
+            " last_count_update_time='{2}')").format(
+                self.__client_id, self.__shared_secret,
+                self.__last_count_update_time)
 
     # -------------------------------------------------------------------------+
     # properties
@@ -451,8 +470,6 @@ class ClientData:
             The incremented last_count value.
 
         """
-        from datetime import datetime
-
         self.__last_count += 1
 
         # get the local time, with timezone
@@ -493,21 +510,8 @@ class ClientData:
                 timezone), or a string with time in ISO format
                 "%Y%m%dT%H%M%S%z"
         """
-        from datetime import datetime
-
         if isinstance(update_time, datetime):
-            self.__last_count_update_time = update_time.strftime(self._isoFmt)
-            # Fix issue on some systems, e.g. Debian, where %Y doesn't zero-pad
-            tpadding = ""
-            if 10 > update_time.year:
-                tpadding = "000"
-            elif 100 > update_time.year:
-                tpadding = "00"
-            elif 1000 > update_time.year:
-                tpadding = "0"
-            if "0" != self.__last_count_update_time[0:1]:
-                self.__last_count_update_time = tpadding + \
-                    self.__last_count_update_time
+            self.__last_count_update_time = _format_timestamp(update_time)
         else:
             self.__last_count_update_time = update_time
 
@@ -538,19 +542,23 @@ class ClientData:
     def to_dict(self):
         """Represent object as a key-value collection.
 
-        Used by ClientDataEncoder, a JSONEncoder.
+        Used by ClientDataEncoder, a JSONEncoder, and ClientFile.save().
+
+        Returns:
+            A new dictionary on every call; the caller owns it and may
+            modify it without affecting this object.
 
         """
-        d = {'clientId': self.__client_id}
-        d.update({'sharedSecret': self.__shared_secret})
-        d.update({'counterFromTime': self.__counter_from_time})
-        d.update({'lastCount': self.__last_count})
-        d.update({'lastCountUpdateTime': self.__last_count_update_time})
-        d.update({'period': self.__period})
-        d.update({'passwordLength': self.__password_length})
-        d.update({'tags': self.__tags})
-        d.update({'note': self.__note})
-        return d
+        return {
+            'clientId': self.__client_id,
+            'sharedSecret': self.__shared_secret,
+            'counterFromTime': self.__counter_from_time,
+            'lastCount': self.__last_count,
+            'lastCountUpdateTime': self.__last_count_update_time,
+            'period': self.__period,
+            'passwordLength': self.__password_length,
+            'tags': self.__tags[:],
+            'note': self.__note}
 
 
 class ClientFile:
@@ -573,8 +581,7 @@ class ClientFile:
         self.__key_stretches = 256 * 1024
         self.__magic_number = 0x7A6A5A4A
         self.__file_version = 1
-        self.__key = self._produce_key(passphrase)
-        self.__iv = self._produce_iv(self.__key)
+        self._set_passphrase(passphrase)
         return
 
     # -------------------------------------------------------------------------+
@@ -609,14 +616,7 @@ class ClientFile:
             The decrypted data as a byte string.
 
         """
-        from cryptography.hazmat.primitives.ciphers \
-            import Cipher, algorithms, modes
-        from cryptography.hazmat.backends import default_backend
-
-        backend = default_backend()
-        cypher = Cipher(
-            algorithms.AES(self.__key), modes.CBC(self.__iv), backend=backend)
-        decryptor = cypher.decryptor()
+        decryptor = self.__cypher.decryptor()
         result = decryptor.update(b) + decryptor.finalize()
         if strip_padding:
             result = result[:-result[-1]]
@@ -634,17 +634,13 @@ class ClientFile:
             The encrypted data as a byte string.
 
         """
-        from cryptography.hazmat.primitives.ciphers \
-            import Cipher, algorithms, modes
-        from cryptography.hazmat.backends import default_backend
-
-        backend = default_backend()
-        cypher = Cipher(
-            algorithms.AES(self.__key), modes.CBC(self.__iv), backend=backend)
-        encryptor = cypher.encryptor()
-        pad_length = 16 - (len(b) % 16)
-        b += bytes([pad_length]) * pad_length
-        result = encryptor.update(b) + encryptor.finalize()
+        encryptor = self.__cypher.encryptor()
+        # Feed the padding separately rather than copying b to append it
+        #
+        padding = _PKCS7_PADDING[16 - (len(b) % 16)]
+        result = (
+            encryptor.update(b) + encryptor.update(padding) +
+            encryptor.finalize())
         return result
 
     def _produce_key(self, passphrase):
@@ -661,13 +657,16 @@ class ClientFile:
             The encryption key as a byte string 32 bytes in length.
 
         """
-        from hashlib import sha256
         pp = bytes(passphrase, 'utf-8')
         hash_alg = sha256(pp)
+        # The key derivation defines the data file format, so it must stay
+        # exactly as is; just keep the hash methods in locals for the loop
+        #
+        digest = hash_alg.digest
+        update = hash_alg.update
         for i in range(self._get_key_stretches()):
-            d = hash_alg.digest()
-            hash_alg.update(d + pp)
-        return hash_alg.digest()
+            update(digest() + pp)
+        return digest()
 
     def _produce_iv(self, key):
         """Generate initialization vector.
@@ -688,6 +687,21 @@ class ClientFile:
         iv = key[b:e]
         return iv
 
+    def _set_passphrase(self, passphrase):
+        """Derive the key, initialization vector, and cypher.
+
+        The Cipher object is kept and reused; each encryption or
+        decryption gets a fresh context from it.
+
+        Args:
+            passphrase: the passphrase string.
+
+        """
+        self.__key = self._produce_key(passphrase)
+        self.__iv = self._produce_iv(self.__key)
+        self.__cypher = Cipher(
+            algorithms.AES(self.__key), modes.CBC(self.__iv), backend=_BACKEND)
+
     def _validate_header(self, cleartext_header, decrypted_header):
         """Whether header of data file is OK and matches expected values.
 
@@ -706,12 +720,7 @@ class ClientFile:
                 stretch count (of hash iterations) is incorrect, or both.
 
         """
-        import struct
-
-        magic_number1 = struct.unpack("!I", decrypted_header[:4])[0]
-        # file_version = struct.unpack("!I", decrypted_header[4:8])[0]
-        # key_stretches = struct.unpack("!I", decrypted_header[8:12])[0]
-        magic_number2 = struct.unpack("!I", decrypted_header[12:])[0]
+        magic_number1, _, _, magic_number2 = _HEADER.unpack(decrypted_header)
         if (self.__magic_number != magic_number1 or
                 self.__magic_number != magic_number2):
             raise DecryptionError()
@@ -732,18 +741,40 @@ class ClientFile:
             filepath: the fully qualified path to the data file.
 
         Returns:
-            The list of ClientData objects found in the data file.
+            The list of ClientData objects found in the data file. This is
+            a new list on every call; the caller owns it and may modify it.
+
+        Raises:
+            FileCorruptionError: When the file is too short to hold the
+                header and its encrypted copy, or the cypher text is not a
+                whole number of AES blocks (e.g. an empty file).
 
         """
-        cypher_text = b''
         with open(filepath, 'rb') as f:
-            header = f.read(16)
-            cypher_text = f.read()
-        data = self._decrypt(cypher_text)
-        decrypted_header = data[:16]
-        self._validate_header(header, decrypted_header)
-        plain_text = str(data[16:], 'utf-8')
-        cds = json.loads(plain_text, cls=ClientDataDecoder)
+            # An empty file can't be mapped, and a truncated one can't be
+            # decrypted, so check the size first
+            #
+            size = os.fstat(f.fileno()).st_size
+            if (32 > size) or (0 != (size - 16) % 16):
+                raise FileCorruptionError()
+            # Decrypt straight out of a read-only mapping of the file, rather
+            # than first copying the cypher text into a bytes object
+            #
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                header = m[:16]
+                with memoryview(m)[16:] as cypher_text:
+                    data = self._decrypt(cypher_text, strip_padding=False)
+        # Slice the decrypted data through a memoryview, so neither the
+        # header nor the JSON document (less the padding) is copied out of it
+        #
+        with memoryview(data)[:-data[-1]] as view:
+            self._validate_header(header, view[:16])
+            # Parse to plain lists and dictionaries, then build the
+            # ClientData objects in one pass (no per-object hook called by
+            # the parser)
+            #
+            o = _parse_json(view[16:])
+        cds = _client_data_from_json(o)
         if cds is None:
             cds = []
         return cds
@@ -760,23 +791,23 @@ class ClientFile:
                 data file.
 
         """
-        import struct
-
-        plain_text = json.dumps(
-            client_data_list, sort_keys=True, indent=4, separators=(',', ': '),
-            cls=ClientDataEncoder)
-        header = b''.join([
-            struct.pack("!I", self.__magic_number),
-            struct.pack("!I", self.__file_version),
-            struct.pack("!I", self.__key_stretches),
-            struct.pack("!I", self.__magic_number)])
-        data = b''.join([
-            header,
-            bytes(plain_text, 'utf-8')])
+        # Always serialize with the standard library (orjson can only indent
+        # by 2), so the layout of the data file doesn't depend on which
+        # optional packages are installed
+        #
+        dicts = [cd.to_dict() for cd in client_data_list]
+        plain_bytes = bytes(json.dumps(
+            dicts, sort_keys=True, indent=4,
+            separators=(',', ': ')), 'utf-8')
+        header = _HEADER.pack(
+            self.__magic_number, self.__file_version, self.__key_stretches,
+            self.__magic_number)
         if new_passphrase is not None:
-            self.__key = self._produce_key(new_passphrase)
-            self.__iv = self._produce_iv(self.__key)
-        cypher_text = self._encrypt(data)
+            self._set_passphrase(new_passphrase)
+        # Encrypt everything before opening the file, so a failure while
+        # encrypting leaves the existing data file as it was
+        #
+        cypher_text = self._encrypt(header + plain_bytes)
         with open(filepath, 'wb') as f:
             f.write(header)
             f.write(cypher_text)
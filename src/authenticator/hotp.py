@@ -49,7 +49,6 @@ This implementation requires:
 * cryptography 1.3 or later (see https://cryptography.io/en/latest/)
 * python-dateutil 2.1 or later
     (see https://pypi.python.org/pypi/python-dateutil/2.1)
-* six 1.10 or later (https://pypi.python.org/pypi/six/1.10.0)
 
 See also:
     http://en.wikipedia.org/wiki/Google_Authenticator
@@ -59,6 +58,73 @@ See also:
 
 """
 
+import base64
+import binascii
+import hmac
+import os
+import time
+from collections import OrderedDict
+
+# hmac.digest() (Python 3.7 or later) computes an HMAC in a single call,
+# without building an HMAC object; fall back to doing just that on earlier
+# versions
+#
+try:
+    _hmac_digest = hmac.digest
+except AttributeError:
+    def _hmac_digest(key, msg, digest):
+        return hmac.new(key, msg, digest).digest()
+
+# secrets (Python 3.6 or later) is the standard interface to the system's
+# cryptographically secure random numbers; before it, that was os.urandom()
+#
+try:
+    from secrets import token_bytes as _token_bytes
+except ImportError:
+    _token_bytes = os.urandom
+
+# The most secret keys a HOTP object remembers, decoded or keyed into an
+# HMAC object; past that the least recently used is forgotten, so that a
+# long-lived object used with many keys (e.g. by a server) neither grows
+# without bound nor holds on to every secret it has seen
+#
+_MAX_CACHED_KEYS = 32
+
+# Powers of ten, indexed by OTP code length
+#
+_POW10 = tuple(10 ** i for i in range(11))
+
+
+def _recall(cache, key):
+    """Look up an entry in a bounded cache, marking it as recently used.
+
+    Args:
+        cache: an OrderedDict, filled by _remember().
+        key: the key of the entry.
+
+    Returns:
+        The value of the entry, or None if the cache does not hold it.
+
+    """
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _remember(cache, key, value):
+    """Add an entry to a bounded cache, evicting the least recently used.
+
+    Args:
+        cache: an OrderedDict, holding at most _MAX_CACHED_KEYS entries.
+        key: the key of the entry.
+        value: the value of the entry.
+
+    """
+    if _MAX_CACHED_KEYS <= len(cache):
+        cache.popitem(last=False)
+    cache[key] = value
+
 
 class HOTP:
     """Implements the HOTP algorithms.
@@ -70,7 +136,83 @@ class HOTP:
 
     def __init__(self):
         """Create a HOTP object."""
-        return
+        # the most recently decoded base32 secrets, so each is decoded only
+        # once
+        #
+        self.__secret_keys = OrderedDict()
+        # keyed HMAC-SHA1 objects for the secret keys most recently used to
+        # produce several codes, so each key is hashed only once
+        #
+        self.__keyed_hmacs = OrderedDict()
+
+    def _hmac(self, secret_key, message):
+        """Compute HMAC-SHA1 of a message with a secret key.
+
+        If _keyed_hmac() has kept an HMAC object for the key, the HMAC is
+        finished from a copy of it. Otherwise hmac.digest() computes it in
+        one call, which is quicker for a key used just once.
+
+        Args:
+            secret_key: the shared secret, as a byte string.
+            message: the message, as a byte string.
+
+        Returns:
+            The HMAC digest; a byte string, 20 bytes long.
+
+        """
+        keyed = self.__keyed_hmacs.get(secret_key)
+        if keyed is None:
+            # Name the digest, rather than pass the hashlib constructor, so
+            # hmac.digest() can use OpenSSL's HMAC directly
+            #
+            return _hmac_digest(secret_key, message, 'sha1')
+        h = keyed.copy()
+        h.update(message)
+        return h.digest()
+
+    def _keyed_hmac(self, secret_key):
+        """Get the HMAC-SHA1 object keyed with a secret key.
+
+        The object has consumed the key but no message. Each HMAC computed
+        with that key can start from a copy of it, rather than hashing the
+        key again.
+
+        Args:
+            secret_key: the shared secret, as a byte string.
+
+        Returns:
+            The keyed hmac.HMAC object. It is kept for later calls, so don't
+            update it; update a copy of it.
+
+        """
+        keyed = _recall(self.__keyed_hmacs, secret_key)
+        if keyed is None:
+            keyed = hmac.new(secret_key, digestmod='sha1')
+            _remember(self.__keyed_hmacs, secret_key, keyed)
+        return keyed
+
+    def _truncated_code(self, hmac, code_length):
+        """Generate the OTP straight from the HMAC.
+
+        Does the work of hash_from_hmac() followed by code_from_hash(), but
+        on integers, without building the intermediate 4-byte hash, and
+        without validating the arguments.
+
+        Args:
+            hmac: A byte string representing the 20-byte HMAC
+            code_length: the number of digits in the code string, in the
+                range [1,10].
+
+        Returns:
+            A string of digits, code_length long, that is the one-time
+            password (OTP).
+
+        """
+        offset = hmac[-1] & 0x0F
+        truncated_hash = (
+            ((hmac[offset] & 0x7F) << 24) | (hmac[offset + 1] << 16) |
+            (hmac[offset + 2] << 8) | hmac[offset + 3])
+        return str(truncated_hash % _POW10[code_length]).zfill(code_length)
 
     def code_from_hash(self, hash, code_length=6):
         """Generate a numeric code, the OTP, given a truncated hash.
@@ -97,8 +239,7 @@ class HOTP:
                 number.
 
         """
-        if ((1 > code_length) or
-                (10 < code_length)):
+        if not (1 <= code_length <= 10):
             raise ValueError('code_length must be in the range [1,10]')
         if not isinstance(hash, bytes):
             raise TypeError('hash must be a byte string')
@@ -107,11 +248,9 @@ class HOTP:
                 'hmac must be a byte string of length 8 (4 bytes)')
 
         int_hash = int.from_bytes(hash, 'big', signed=False)
-        code = int_hash % (10**code_length)
-        code_string = str(code)
+        code = int_hash % _POW10[code_length]
         # pad on left as needed to achieve codeLength digits
-        code_string = "0" * (code_length - len(code_string)) + code_string
-        return code_string
+        return str(code).zfill(code_length)
 
     def counter_from_time(self, period=30):
         """Create 8-byte counter from current time.
@@ -145,18 +284,15 @@ class HOTP:
             TypeError: period is not numeric or not a numeric string
 
         """
-        import time
-        import datetime
-
         # make sure period is an integer
         period = int(period)
         if (0 >= period):
             raise ValueError('period must be positive integer')
 
-        local_now = datetime.datetime.now()
-        seconds_now = time.mktime(local_now.timetuple())
-        intervals = seconds_now // period
-        remaining_seconds = seconds_now - (intervals * period)
+        # TOTP counts from the UNIX epoch in UTC, which is just what
+        # time.time() gives us
+        #
+        intervals, remaining_seconds = divmod(int(time.time()), period)
         counter = self.num_to_counter(intervals)
         return (counter, remaining_seconds)
 
@@ -182,23 +318,27 @@ class HOTP:
             TypeError: if base32_secret_key does not contain valid base32
                 encoding (invalid characters)
         """
-        import base64
-        import binascii
+        secret_key = _recall(self.__secret_keys, base32_secret_key)
+        if secret_key is not None:
+            return secret_key
 
         # Pad the base32 string to a multiple of 8 characters
         #
-        secret_length = len(base32_secret_key)
-        pad_length = (8 - (secret_length % 8)) % 8
-        pad = "=" * pad_length
-        base32_secret_key = base32_secret_key + pad
+        pad_length = -len(base32_secret_key) & 7
 
-        # Decode it
+        # Decode it (as bytes, which b32decode would otherwise convert to)
         #
         try:
-            secret_key = base64.b32decode(base32_secret_key)
+            secret_bytes = base32_secret_key.encode('ascii')
+        except UnicodeEncodeError:
+            raise ValueError(
+                'string argument should contain only ASCII characters')
+        try:
+            secret_key = base64.b32decode(secret_bytes + b'=' * pad_length)
         except binascii.Error:
             raise ValueError(
                 'Wrong length, incorrect padding, or embedded whitespace')
+        _remember(self.__secret_keys, base32_secret_key, secret_key)
         return secret_key
 
     def generate_code_from_counter(self, secret_key, counter, code_length=6):
@@ -239,34 +379,57 @@ class HOTP:
             raise ValueError('counter must be 8 bytes')
         # make sure codeLength is an integer
         code_length = int(code_length)
-        if ((1 > code_length) or
-                (10 < code_length)):
+        if not (1 <= code_length <= 10):
             raise ValueError('code_length must be in the range [1,10]')
         if not isinstance(secret_key, bytes):
             secret_key = self.convert_base32_secret_key(secret_key)
 
         # message is the counter value (as byte string, length 8)
-        #
-        message = counter
         # hash := HMAC-SHA1(key, message)
+        # (the arguments are already checked, so skip generate_hmac())
         #
-        hmac = self.generate_hmac(secret_key, message)
+        hmac = self._hmac(secret_key, counter)
         # offset := last nibble of hash
         # truncated_hash := hash[offset..offset+3]
         # (that is 4 bytes starting at the offset)
         # Set the first bit of truncatedHash to zero
         # (remove the most significant bit)
-        #
-        truncated_hash = self.hash_from_hmac(hmac)
         # code := truncated_hash mod 1000000
         # pad code with 0 until length of code is 6
         #
-        code_string = self.code_from_hash(
-            truncated_hash, code_length=code_length)
+        code_string = self._truncated_code(hmac, code_length)
         # return code
         #
         return code_string
 
+    def generate_code_from_counter_fast(
+            self, secret_key, counter, code_length=6):
+        """Produce the counter-based OTP, without checking the arguments.
+
+        For callers that produce many codes from the same, already
+        validated, secret key and code length; e.g. a server checking a
+        window of counter values. Passing anything else is undefined;
+        use generate_code_from_counter() instead.
+
+        Args:
+            secret_key: The shared secret between the client and server, as
+                a byte string.
+            counter: The event or counter value, as an integer in the range
+                [0,2**64 - 1].
+            code_length: the number of digits in the OTP string, as an
+                integer in the range [1,10].
+
+        Returns:
+            The counter-based OTP, as a string of digits.
+
+        """
+        # Keep the keyed HMAC object, so the key is hashed just once
+        #
+        self._keyed_hmac(secret_key)
+        return self._truncated_code(
+            self._hmac(secret_key, counter.to_bytes(8, 'big')),
+            code_length)
+
     def generate_code_from_time(self, secret_key, code_length=6, period=30):
         """Produce the time-based OTP given a secret key.
 
@@ -296,8 +459,7 @@ class HOTP:
             raise ValueError('period must be positive integer')
         # make sure codeLength is an integer
         code_length = int(code_length)
-        if ((1 > code_length) or
-                (10 < code_length)):
+        if not (1 <= code_length <= 10):
             raise ValueError('code_length must be in the range [1,10]')
         if not isinstance(secret_key, bytes):
             secret_key = self.convert_base32_secret_key(secret_key)
@@ -309,21 +471,113 @@ class HOTP:
         #
         hmac = self.generate_hmac(secret_key, message)
         # offset := last nibble of hash
-        # truncatedH_hsh := hash[offset..offset+3]
+        # truncated_hash := hash[offset..offset+3]
         # (that is 4 bytes starting at the offset)
         # Set the first bit of truncatedHash to zero
         # (remove the most significant bit)
-        #
-        truncated_hash = self.hash_from_hmac(hmac)
         # code := truncated_hash mod 1000000
         # pad code with 0 until length of code is 6
         #
-        code_string = self.code_from_hash(
-            truncated_hash, code_length=code_length)
+        code_string = self._truncated_code(hmac, code_length)
         # return code, remaining seconds
         #
         return code_string, int(period - remaining_seconds)
 
+    def generate_codes_for_window(
+            self, secret_key, center_counter, window=1, code_length=6):
+        """Produce the counter-based OTPs for a window of counter values.
+
+        A server checking an OTP usually accepts any counter within a
+        window around the one it expects, to allow for drift. The key is
+        hashed into the HMAC state once, rather than once per counter.
+
+        Args:
+            secret_key: The shared secret between the client and server. This
+                can be either a string containing the secret in base32
+                encoding, or a unencoded byte string.
+            center_counter: The expected counter value, an integer in the
+                range [0,2**64 - 1].
+            window: The number of counter values either side of
+                center_counter to produce OTPs for. Must be zero or a
+                positive integer.
+            code_length: the number of digits in the OTP string. Must be in
+                the range [1,10].
+
+        Returns:
+            A list of (counter, OTP) tuples, in counter order, for the
+            counters in [center_counter - window, center_counter + window]
+            that are in the range [0,2**64 - 1].
+
+        Raises:
+            TypeError: secret_key not a byte string or normal string.
+            ValueError: center_counter outside the range [0, 2**64 - 1], or
+                window negative, or code_length not in the range [1,10]. Or
+                the secret key is invalid base32.
+
+        """
+        center_counter = int(center_counter)
+        if center_counter >> 64:
+            raise ValueError('center_counter must be in [0, 2**64 - 1]')
+        window = int(window)
+        if (0 > window):
+            raise ValueError('window must be zero or a positive integer')
+        counters = range(
+            max(0, center_counter - window),
+            min(2**64, center_counter + window + 1))
+        codes = self.generate_codes_from_counters(
+            secret_key, counters, code_length=code_length)
+        return list(zip(counters, codes))
+
+    def generate_codes_from_counters(
+            self, secret_key, counters, code_length=6):
+        """Produce the counter-based OTPs for many counter values.
+
+        The secret key is decoded, and hashed into the HMAC state, once
+        for the whole batch; each code then costs just the HMAC of its
+        counter and the truncation.
+
+        Args:
+            secret_key: The shared secret between the client and server. This
+                can be either a string containing the secret in base32
+                encoding, or a unencoded byte string.
+            counters: An iterable of integer counter values, each in the
+                range [0,2**64 - 1].
+            code_length: the number of digits in the OTP string. Must be in
+                the range [1,10].
+
+        Returns:
+            A list of the OTPs, as strings of digits, in the same order as
+            counters.
+
+        Raises:
+            TypeError: secret_key not a byte string or normal string.
+            ValueError: a counter outside the range [0, 2**64 - 1], or
+                code_length not in the range [1,10]. Or the secret key is
+                invalid base32.
+
+        """
+        # make sure codeLength is an integer
+        code_length = int(code_length)
+        if not (1 <= code_length <= 10):
+            raise ValueError('code_length must be in the range [1,10]')
+        if not isinstance(secret_key, bytes):
+            secret_key = self.convert_base32_secret_key(secret_key)
+
+        # Keep the keyed HMAC object, so the key is hashed just once
+        #
+        self._keyed_hmac(secret_key)
+        hmac_for = self._hmac
+        truncated_code = self._truncated_code
+        codes = []
+        for counter in counters:
+            counter = int(counter)
+            if counter >> 64:
+                raise ValueError('counters must be in [0, 2**64 - 1]')
+            codes.append(truncated_code(
+                hmac_for(secret_key, counter.to_bytes(8, 'big')),
+                code_length))
+        return codes
+
     def generate_hmac(self, secret_key, counter):
         """Create a 160-bit HMAC from secret and counter.
 
@@ -342,9 +596,6 @@ class HOTP:
             ValueError: if the counter is not 8 bytes long.
 
         """
-        from hashlib import sha1
-        import hmac
-
         if not isinstance(secret_key, bytes):
             raise TypeError('secret_key must be a byte string')
         if not isinstance(counter, bytes):
@@ -352,9 +603,7 @@ class HOTP:
         if (8 != len(counter)):
             raise ValueError('counter must be 8 bytes')
 
-        hmac = hmac.new(secret_key, counter, sha1)
-        hash = hmac.digest()
-        return hash
+        return self._hmac(secret_key, counter)
 
     def hash_from_hmac(self, hmac):
         """Get a 4-byte hash from the HMAC.
@@ -380,17 +629,15 @@ class HOTP:
 
         # offset := last nibble of hash
         #
-        offset = int("0" + hex(hmac[-1])[-1], 16)
-        # Get the 4 bytes starting at the offset
-        #
-        chunk = hmac[offset:(offset + 4)]
-        # Set the first bit of truncatedHash to zero
-        # (remove the most significant bit)
+        offset = hmac[-1] & 0x0F
+        # Get the 4 bytes starting at the offset, and set the first bit
+        # of truncatedHash to zero (remove the most significant bit)
         #
-        truncated_hash = bytes([chunk[0] & 127]) + chunk[1:]
+        truncated_hash = int.from_bytes(
+            hmac[offset:(offset + 4)], 'big') & 0x7FFFFFFF
         # Get out
         #
-        return truncated_hash
+        return truncated_hash.to_bytes(4, 'big')
 
     def num_to_counter(self, num):
         """Create an 8-byte counter suitable for HMAC generation.
@@ -416,21 +663,23 @@ class HOTP:
 
         """
         inum = int(num)
-        if (0 > inum) or (2**64 <= inum):
+        # any bits above the lowest 64 (and, for a negative number, its
+        # infinite sign bits) leave something after the shift
+        #
+        if inum >> 64:
             raise ValueError('num')
-        s_hex = hex(int(num))[2:]
-        l_hex = len(s_hex)
-        s_hex = ('0' * (16-l_hex)) + s_hex
-        ba_counter = bytes.fromhex(s_hex)
-        return ba_counter
+        return inum.to_bytes(8, 'big')
 
 # in progress
 
 # not yet tested
 
     def generate_secret_key(self):
-        """Generate a cryptographically random secret key."""
-        import os
+        """Generate a cryptographically random secret key.
 
-        secret_key = os.urandom(10)
-        return secret_key
+        Returns:
+            A byte string, 20 bytes (160 bits) long; the minimum length
+            recommended by RFC4226.
+
+        """
+        return _token_bytes(20)
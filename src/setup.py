@@ -98,10 +98,9 @@ setup(
     # for example:
     # $ pip install -e .[dev,test]
     #
-    # extras_require={
-    #     'dev': ['check-manifest'],
-    #     'test': ['coverage'],
-    # },
+    extras_require={
+        'orjson': ['orjson; python_version >= "3.8"'],
+    },
 
     # If there are data files included in your packages that need to be
     # installed, specify them here.  If using Python 2.6 or less, then these
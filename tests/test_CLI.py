@@ -4,40 +4,78 @@
 #
 """Unit tests for the cli module."""
 
+import contextlib
 import unittest
 import unittest.mock
 import os
+import os.path
 import re
-import sys
-from authenticator import CLI
+import tempfile
+from datetime import datetime, timezone, timedelta
+import authenticator
+from authenticator import CLI, ClientData
+
+
+def _local_timezone():
+    """Figure the local timezone as a fixed UTC offset."""
+    lt = datetime.now()
+    ut = datetime.utcnow()
+    lt2 = datetime.now()
+    if ut.second == lt2.second:
+        lt = lt2
+
+    # Strip off the microseconds, or the deltatime won't be in
+    # round seconds
+    #
+    lt = datetime(
+        lt.year, lt.month, lt.day, lt.hour, lt.minute, lt.second)
+    ut = datetime(
+        ut.year, ut.month, ut.day, ut.hour, ut.minute, ut.second)
 
+    # Get UTC offset as a timedelta object
+    #
+    dt = ut - lt
 
-class CoreCLITests(unittest.TestCase):
-    """Tests for the cli module."""
+    # Get UTC offset in minutes
+    #
+    offset_minutes = 0
+    if (0 == dt.days):
+        offset_minutes = dt.seconds // 60
+    else:
+        dt = lt - ut
+        offset_minutes = dt.seconds // 60
+        offset_minutes *= -1
+    return timezone(timedelta(minutes=offset_minutes))
 
-    class RedirectStdStreams:
-        """Redirect the standard streams.
 
-        A context manager that can temporarily redirect the standard
-        streams.
+# The local timezone only needs figuring once, not once per test case
+#
+_LOCAL_TZ = _local_timezone()
+
+# The last writes of a successful 'add'
+#
+_OK_WRITES = [unittest.mock.call("OK"), unittest.mock.call("\n")]
 
-        """
 
-        def __init__(self, stdout=None, stderr=None):
-            self._stdout = stdout or sys.stdout
-            self._stderr = stderr or sys.stderr
+def _mock_stream():
+    """Make a mock standing in for the stdin/stdout/stderr of a CLI.
 
-        def __enter__(self):
-            self.old_stdout, self.old_stderr = sys.stdout, sys.stderr
-            self.old_stdout.flush()
-            self.old_stderr.flush()
-            sys.stdout, sys.stderr = self._stdout, self._stderr
+    The CLI only reads lines from and writes to its streams, so a Mock
+    with that narrow spec is enough, and much cheaper to build than a
+    MagicMock with the whole magic method protocol.
 
-        def __exit__(self, exc_type, exc_value, traceback):
-            self._stdout.flush()
-            self._stderr.flush()
-            sys.stdout = self.old_stdout
-            sys.stderr = self.old_stderr
+    """
+    return unittest.mock.Mock(spec=['flush', 'read', 'readline', 'write'])
+
+
+class CoreCLITests(unittest.TestCase):
+    """Tests for the cli module."""
+
+    # The data file written by _add_three_hotp_to_file(), keyed by
+    # passphrase, so that _copy_three_hotp_to_file() only has to build it
+    # once
+    #
+    _three_hotp_data = {}
 
     # NOTE: many of theses tests use a mock for expanduser to change the
     #       default location of the data file to a temporary directory so
@@ -50,51 +88,6 @@ class CoreCLITests(unittest.TestCase):
     #       developers won't be tempted to bypass the (otherwise slow) tests.
     #
 
-    def __init__(self, *args):
-        """Constructor."""
-        from datetime import datetime, timezone, timedelta
-
-        # figure the local timezone
-        #
-        lt = datetime.now()
-        ut = datetime.utcnow()
-        lt2 = datetime.now()
-        if ut.second == lt2.second:
-            lt = lt2
-
-        # Strip off the microseconds, or the deltatime won't be in
-        # round seconds
-        #
-        lt = datetime(
-            lt.year, lt.month, lt.day, lt.hour, lt.minute, lt.second)
-        ut = datetime(
-            ut.year, ut.month, ut.day, ut.hour, ut.minute, ut.second)
-
-        # Get UTC offset as a timedelta object
-        #        dt = ut - lt
-        dt = ut - lt
-
-        # Get UTC offset in minutes
-        #
-        offset_minutes = 0
-        if (0 == dt.days):
-            offset_minutes = dt.seconds // 60
-        else:
-            dt = lt - ut
-            offset_minutes = dt.seconds // 60
-            offset_minutes *= -1
-        dt = timedelta(minutes=offset_minutes)
-        self.__tz = timezone(dt)
-
-        self.devnull = open(os.devnull, "w")
-        super().__init__(*args)
-
-    def __del__(self):
-        """Test fixture destructor."""
-        if self.devnull is not None:
-            self.devnull.close()
-            self.devnull = None
-
     # ------------------------------------------------------------------------+
     # private methods
     # ------------------------------------------------------------------------+
@@ -112,56 +105,50 @@ class CoreCLITests(unittest.TestCase):
             expected_passphrase: The passphrase used to protect the data file.
 
         """
-        expected_shared_secret1 = "ABCDEFGHABCDEFGHABCDEFGHGY3TQOJQ"
-        rw_mock = unittest.mock.MagicMock()
-        rw_mock.readline.side_effect = [
-            'yes', expected_passphrase, expected_passphrase,
-            expected_shared_secret1]
-        cut = CLI(stdin=rw_mock, stdout=rw_mock)
-        args = ("add", "012345@nom.deplume")
-        cut.parse_command_args(args)
-        cut.create_data_file()
-        cut.prompt_for_secrets()
-        rw_mock.reset_mock()
-        cut.execute()
-        calls = [
-            unittest.mock.call.write("OK"),
-            unittest.mock.call.write("\n")]
-        rw_mock.assert_has_calls(calls)
-        # Add the second configuration
-        #
-        expected_shared_secret2 = "ABCDEFGHGY3TQOJQGEZDGNBVGY3TQOJQ"
-        rw_mock.reset_mock()
-        rw_mock.readline.side_effect = [
-            expected_passphrase, expected_shared_secret2]
-        cut = CLI(stdin=rw_mock, stdout=rw_mock)
-        args = ("add", "mickey@prisney.com", "--counter", "11")
-        cut.parse_command_args(args)
-        cut.create_data_file()
-        cut.prompt_for_secrets()
-        rw_mock.reset_mock()
-        cut.execute()
-        calls = [
-            unittest.mock.call.write("OK"),
-            unittest.mock.call.write("\n")]
-        rw_mock.assert_has_calls(calls)
-        # Add the third configuration
-        #
-        expected_shared_secret3 = "GEZDGNBVGY3TQOJQGEZDGNBVABCDEFGH"
-        rw_mock.reset_mock()
-        rw_mock.readline.side_effect = [
-            expected_passphrase, expected_shared_secret3]
-        cut = CLI(stdin=rw_mock, stdout=rw_mock)
-        args = ("add", "donald@prisney.com", "--period", "20")
-        cut.parse_command_args(args)
-        cut.create_data_file()
-        cut.prompt_for_secrets()
-        rw_mock.reset_mock()
-        cut.execute()
-        calls = [
-            unittest.mock.call.write("OK"),
-            unittest.mock.call.write("\n")]
-        rw_mock.assert_has_calls(calls)
+        # The first add also creates the data file, so it answers the
+        # prompt to create it and confirms the passphrase
+        #
+        configs = (
+            (("add", "012345@nom.deplume"),
+             ['yes', expected_passphrase, expected_passphrase,
+              "ABCDEFGHABCDEFGHABCDEFGHGY3TQOJQ"]),
+            (("add", "mickey@prisney.com", "--counter", "11"),
+             [expected_passphrase, "ABCDEFGHGY3TQOJQGEZDGNBVGY3TQOJQ"]),
+            (("add", "donald@prisney.com", "--period", "20"),
+             [expected_passphrase, "GEZDGNBVGY3TQOJQGEZDGNBVABCDEFGH"]))
+        rw_mock = _mock_stream()
+        for args, lines in configs:
+            rw_mock.readline.side_effect = lines
+            cut = CLI(stdin=rw_mock, stdout=rw_mock)
+            cut.parse_command_args(args)
+            cut.create_data_file()
+            cut.prompt_for_secrets()
+            cut.execute()
+            self.assertEqual(_OK_WRITES, rw_mock.write.call_args_list[-2:])
+
+    def _copy_three_hotp_to_file(self, expected_passphrase):
+        """Copy a prebuilt data file with several HOTP into place.
+
+        Same as _add_three_hotp_to_file(), except the data file is only
+        built by the first call for a given passphrase; later calls just
+        write a copy of it. Don't use this when the test depends on when the
+        configurations were added.
+
+        Args:
+            expected_passphrase: The passphrase used to protect the data file.
+
+        """
+        data_dir = os.path.join(self.temp_dir_path.name, ".authenticator")
+        data_file = os.path.join(data_dir, "authenticator.data")
+        data = CoreCLITests._three_hotp_data.get(expected_passphrase)
+        if data is None:
+            self._add_three_hotp_to_file(expected_passphrase)
+            with open(data_file, "rb") as f:
+                CoreCLITests._three_hotp_data[expected_passphrase] = f.read()
+            return
+        os.makedirs(data_dir, mode=0o755, exist_ok=True)
+        with open(data_file, "wb") as f:
+            f.write(data)
 
     def _add_one_time_based_hotp_to_file(self, expected_passphrase):
         """Add a singled time-based HOTP to the data file.
@@ -174,7 +161,7 @@ class CoreCLITests(unittest.TestCase):
 
         """
         expected_shared_secret = "ABCDEFGHABCDEFGHABCDEFGHGY3TQOJQ"
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             'yes', expected_passphrase, expected_passphrase,
             expected_shared_secret]
@@ -183,12 +170,8 @@ class CoreCLITests(unittest.TestCase):
         cut.parse_command_args(args)
         cut.create_data_file()
         cut.prompt_for_secrets()
-        rw_mock.reset_mock()
         cut.execute()
-        calls = [
-            unittest.mock.call.write("OK"),
-            unittest.mock.call.write("\n")]
-        rw_mock.assert_has_calls(calls)
+        self.assertEqual(_OK_WRITES, rw_mock.write.call_args_list[-2:])
 
     def _assert_configuration_count_from_file(
             self, expected_passphrase, expected_count):
@@ -202,7 +185,7 @@ class CoreCLITests(unittest.TestCase):
             expected_count: The number of listed configurations.
 
         """
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -210,43 +193,49 @@ class CoreCLITests(unittest.TestCase):
         cut.parse_command_args(args)
         cut.create_data_file()
         cut.prompt_for_secrets()
-        rw_mock.reset_mock()
+        base = rw_mock.write.call_count
         cut.execute()
         if 0 == expected_count:
             calls = [
-                unittest.mock.call.write("No HOTP/TOTP configurations found."),
-                unittest.mock.call.write("\n")]
-            rw_mock.assert_has_calls(calls)
+                unittest.mock.call("No HOTP/TOTP configurations found."),
+                unittest.mock.call("\n")]
+            self.assertEqual(calls, rw_mock.write.call_args_list[-2:])
         else:
             expected_call_count = 2 * expected_count
             # add 2 for leading blank line
             expected_call_count += 2
             self.assertEqual(
-                expected_call_count, rw_mock.write.call_count,
+                expected_call_count, rw_mock.write.call_count - base,
                 "Expected {0} configurations listed".format(expected_count))
 
     def _side_effect_expand_user(self, path):
         if not path.startswith("~"):
             return path
-        path = path.replace("~", self.temp_dir_path.name)
+        path = path.replace("~", self.temp_dir_path.name, 1)
         return path
 
     # ------------------------------------------------------------------------+
     # setup, teardown, noop
     # ------------------------------------------------------------------------+
 
+    @classmethod
+    def setUpClass(cls):
+        """Open the null device once for the whole fixture."""
+        cls.devnull = open(os.devnull, "w")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Close the null device."""
+        cls.devnull.close()
+        cls.devnull = None
+
     def setUp(self):
         """Create data used by the test cases."""
-        import tempfile
-
         self.temp_dir_path = tempfile.TemporaryDirectory()
-        self.temp_dir_path2 = tempfile.TemporaryDirectory()
         return
 
     def tearDown(self):
         """Cleanup data used by the test cases."""
-        self.temp_dir_path2.cleanup()
-        self.temp_dir_path2 = None
         self.temp_dir_path.cleanup()
         self.temp_dir_path = None
 
@@ -287,8 +276,8 @@ class CoreCLITests(unittest.TestCase):
         """
         args = ("add", "my.client.id", "--period", "20", "-v")
         with self.assertRaises(SystemExit):
-            with CoreCLITests.RedirectStdStreams(
-                    stdout=self.devnull, stderr=self.devnull):
+            with contextlib.redirect_stdout(self.devnull), \
+                    contextlib.redirect_stderr(self.devnull):
                 cut = CLI()
                 cut.parse_command_args(args)
 
@@ -314,7 +303,7 @@ class CoreCLITests(unittest.TestCase):
         Bad args. 'add' subcommand with unexpected '--counter' argument.
 
         """
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         cut = CLI(stdout=rw_mock, stderr=rw_mock)
         args = ("add", "sam@i.am", "--period", "20", "--counter", "10")
         with self.assertRaises(SystemExit):
@@ -369,30 +358,32 @@ class CoreCLITests(unittest.TestCase):
         self.assertNotIn('clientIdPattern', cut.args)
 
     @unittest.mock.patch('os.path.expanduser')
-    def test_parse_alt_data_file(self, mock_expanduser):
+    def test_parse_alt_data(self, mock_expanduser):
         """Test CLI.parse_command_args().
 
-        Happy path '--data' argument.
+        Happy path '--data' argument, naming the data file, its directory,
+        and its directory with a trailing slash.
 
         """
-        import os.path
-        import os
-
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
         p = os.path.expanduser("~/Dropball/AppData/authenticator")
         p = os.path.normpath(p)
         os.makedirs(p, mode=0o766)
-        alt_path = os.path.normpath(
-            "~/Dropball/AppData/authenticator/authenticator.data")
-        expected_path = os.path.expanduser(alt_path)
-        cut = CLI()
-        args = ("--data", alt_path, "info")
-        cut.parse_command_args(args)
-        self.assertEqual('info', cut.args.subcmd)
-        self.assertIn('altDataFile', cut.args)
-        self.assertEqual(alt_path, cut.args.altDataFile)
-        self.assertEqual(expected_path, cut._CLI__data_file)
+        expected_path = os.path.join(p, 'authenticator.data')
+        for alt_path in (
+                "~/Dropball/AppData/authenticator/authenticator.data",
+                "~/Dropball/AppData/authenticator",
+                "~/Dropball/AppData/authenticator/"):
+            with self.subTest(alt_path=alt_path):
+                alt_path = os.path.normpath(alt_path)
+                cut = CLI()
+                args = ("--data", alt_path, "info")
+                cut.parse_command_args(args)
+                self.assertEqual('info', cut.args.subcmd)
+                self.assertIn('altDataFile', cut.args)
+                self.assertEqual(alt_path, cut.args.altDataFile)
+                self.assertEqual(expected_path, cut._CLI__data_file)
 
     @unittest.mock.patch('os.path.expanduser')
     def test_parse_alt_data_file_missing_dir(self, mock_expanduser):
@@ -401,9 +392,6 @@ class CoreCLITests(unittest.TestCase):
         Happy path '--data' argument.
 
         """
-        import os.path
-        import os
-
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
         p = os.path.expanduser("~/Dropball/AppData/authenticator")
@@ -411,64 +399,12 @@ class CoreCLITests(unittest.TestCase):
         alt_path = os.path.normpath(
             "~/Dropball/AppData/authenticator/authenticator.data")
         with self.assertRaises(SystemExit):
-            with CoreCLITests.RedirectStdStreams(
-                    stdout=self.devnull, stderr=self.devnull):
+            with contextlib.redirect_stdout(self.devnull), \
+                    contextlib.redirect_stderr(self.devnull):
                 cut = CLI()
                 args = ("--data", alt_path, "info")
                 cut.parse_command_args(args)
 
-    @unittest.mock.patch('os.path.expanduser')
-    def test_parse_alt_data_dir(self, mock_expanduser):
-        """Test CLI.parse_command_args().
-
-        Happy path '--data' argument.
-
-        """
-        import os.path
-        import os
-
-        mock_expanduser.side_effect = \
-            lambda x: self._side_effect_expand_user(x)
-        p = os.path.expanduser("~/Dropball/AppData/authenticator")
-        p = os.path.normpath(p)
-        os.makedirs(p, mode=0o766)
-        alt_path = os.path.normpath("~/Dropball/AppData/authenticator")
-        expected_path = os.path.join(
-            os.path.expanduser(alt_path), 'authenticator.data')
-        cut = CLI()
-        args = ("--data", alt_path, "info")
-        cut.parse_command_args(args)
-        self.assertEqual('info', cut.args.subcmd)
-        self.assertIn('altDataFile', cut.args)
-        self.assertEqual(alt_path, cut.args.altDataFile)
-        self.assertEqual(expected_path, cut._CLI__data_file)
-
-    @unittest.mock.patch('os.path.expanduser')
-    def test_parse_alt_data_dir_trailing_slash(self, mock_expanduser):
-        """Test CLI.parse_command_args().
-
-        Happy path '--data' argument.
-
-        """
-        import os.path
-        import os
-
-        mock_expanduser.side_effect = \
-            lambda x: self._side_effect_expand_user(x)
-        p = os.path.expanduser("~/Dropball/AppData/authenticator")
-        p = os.path.normpath(p)
-        os.makedirs(p, mode=0o766)
-        alt_path = os.path.normpath("~/Dropball/AppData/authenticator/")
-        expected_path = os.path.join(
-            os.path.expanduser(alt_path), 'authenticator.data')
-        cut = CLI()
-        args = ("--data", alt_path, "info")
-        cut.parse_command_args(args)
-        self.assertEqual('info', cut.args.subcmd)
-        self.assertIn('altDataFile', cut.args)
-        self.assertEqual(alt_path, cut.args.altDataFile)
-        self.assertEqual(expected_path, cut._CLI__data_file)
-
     def test_parse_del(self):
         """Test CLI.parse_command_args().
 
@@ -509,8 +445,8 @@ class CoreCLITests(unittest.TestCase):
         """
         args = ("delete", "my.client.id", "-v")
         with self.assertRaises(SystemExit):
-            with CoreCLITests.RedirectStdStreams(
-                    stdout=self.devnull, stderr=self.devnull):
+            with contextlib.redirect_stdout(self.devnull), \
+                    contextlib.redirect_stderr(self.devnull):
                 cut = CLI()
                 cut.parse_command_args(args)
 
@@ -522,8 +458,8 @@ class CoreCLITests(unittest.TestCase):
         """
         args = ("delete")
         with self.assertRaises(SystemExit):
-            with CoreCLITests.RedirectStdStreams(
-                    stdout=self.devnull, stderr=self.devnull):
+            with contextlib.redirect_stdout(self.devnull), \
+                    contextlib.redirect_stderr(self.devnull):
                 cut = CLI()
                 cut.parse_command_args(args)
 
@@ -569,8 +505,8 @@ class CoreCLITests(unittest.TestCase):
         """
         args = ("generate", "my.client.id", "-v")
         with self.assertRaises(SystemExit):
-            with CoreCLITests.RedirectStdStreams(
-                    stdout=self.devnull, stderr=self.devnull):
+            with contextlib.redirect_stdout(self.devnull), \
+                    contextlib.redirect_stderr(self.devnull):
                 cut = CLI()
                 cut.parse_command_args(args)
 
@@ -582,8 +518,8 @@ class CoreCLITests(unittest.TestCase):
         """
         args = ("generate", "my.client.id", "--refresh", "sometime")
         with self.assertRaises(SystemExit):
-            with CoreCLITests.RedirectStdStreams(
-                    stdout=self.devnull, stderr=self.devnull):
+            with contextlib.redirect_stdout(self.devnull), \
+                    contextlib.redirect_stderr(self.devnull):
                 cut = CLI()
                 cut.parse_command_args(args)
 
@@ -595,8 +531,8 @@ class CoreCLITests(unittest.TestCase):
         """
         args = ("generate")
         with self.assertRaises(SystemExit):
-            with CoreCLITests.RedirectStdStreams(
-                    stdout=self.devnull, stderr=self.devnull):
+            with contextlib.redirect_stdout(self.devnull), \
+                    contextlib.redirect_stderr(self.devnull):
                 cut = CLI()
                 cut.parse_command_args(args)
 
@@ -677,8 +613,8 @@ class CoreCLITests(unittest.TestCase):
         """
         args = ("info", "-v")
         with self.assertRaises(SystemExit):
-            with CoreCLITests.RedirectStdStreams(
-                    stdout=self.devnull, stderr=self.devnull):
+            with contextlib.redirect_stdout(self.devnull), \
+                    contextlib.redirect_stderr(self.devnull):
                 cut = CLI()
                 cut.parse_command_args(args)
 
@@ -690,8 +626,8 @@ class CoreCLITests(unittest.TestCase):
         """
         args = ("--xxx", "what", "-yz")
         with self.assertRaises(SystemExit):
-            with CoreCLITests.RedirectStdStreams(
-                    stdout=self.devnull, stderr=self.devnull):
+            with contextlib.redirect_stdout(self.devnull), \
+                    contextlib.redirect_stderr(self.devnull):
                 cut = CLI()
                 cut.parse_command_args(args)
 
@@ -703,8 +639,8 @@ class CoreCLITests(unittest.TestCase):
         """
         args = ("nothing")
         with self.assertRaises(SystemExit):
-            with CoreCLITests.RedirectStdStreams(
-                    stdout=self.devnull, stderr=self.devnull):
+            with contextlib.redirect_stdout(self.devnull), \
+                    contextlib.redirect_stderr(self.devnull):
                 cut = CLI()
                 cut.parse_command_args(args)
 
@@ -767,8 +703,8 @@ class CoreCLITests(unittest.TestCase):
         """
         args = ("list", "*wat*", "--pdq", "xyz")
         with self.assertRaises(SystemExit):
-            with CoreCLITests.RedirectStdStreams(
-                    stdout=self.devnull, stderr=self.devnull):
+            with contextlib.redirect_stdout(self.devnull), \
+                    contextlib.redirect_stderr(self.devnull):
                 cut = CLI()
                 cut.parse_command_args(args)
 
@@ -798,8 +734,8 @@ class CoreCLITests(unittest.TestCase):
         """
         args = ("list", "--pdq", "xyz")
         with self.assertRaises(SystemExit):
-            with CoreCLITests.RedirectStdStreams(
-                    stdout=self.devnull, stderr=self.devnull):
+            with contextlib.redirect_stdout(self.devnull), \
+                    contextlib.redirect_stderr(self.devnull):
                 cut = CLI()
                 cut.parse_command_args(args)
 
@@ -833,8 +769,8 @@ class CoreCLITests(unittest.TestCase):
             "set", "clientid",
             "Wat:captian@beefheart.org")
         with self.assertRaises(SystemExit):
-            with CoreCLITests.RedirectStdStreams(
-                    stdout=self.devnull, stderr=self.devnull):
+            with contextlib.redirect_stdout(self.devnull), \
+                    contextlib.redirect_stderr(self.devnull):
                 cut = CLI()
                 cut.parse_command_args(args)
 
@@ -847,7 +783,7 @@ class CoreCLITests(unittest.TestCase):
         expected_err_msg = (
             "authenticator: error: oldClientId must be an exact match; " +
             "no wildcards\n", )
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         cut = CLI(stdout=rw_mock, stderr=rw_mock)
         args = (
             "set", "clientid",
@@ -866,7 +802,7 @@ class CoreCLITests(unittest.TestCase):
         expected_err_msg = (
             "authenticator: error: newClientId must not be a " +
             "wildcard string\n", )
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         cut = CLI(stdout=rw_mock, stderr=rw_mock)
         args = (
             "set", "clientid",
@@ -900,8 +836,8 @@ class CoreCLITests(unittest.TestCase):
             "set", "passphrase",
             "Wat:captian@beefheart.org")
         with self.assertRaises(SystemExit):
-            with CoreCLITests.RedirectStdStreams(
-                    stdout=self.devnull, stderr=self.devnull):
+            with contextlib.redirect_stdout(self.devnull), \
+                    contextlib.redirect_stderr(self.devnull):
                 cut = CLI()
                 cut.parse_command_args(args)
 
@@ -938,11 +874,38 @@ class CoreCLITests(unittest.TestCase):
         """
         args = ("--version", "wat")
         with self.assertRaises(SystemExit):
-            with CoreCLITests.RedirectStdStreams(
-                    stdout=self.devnull, stderr=self.devnull):
+            with contextlib.redirect_stdout(self.devnull), \
+                    contextlib.redirect_stderr(self.devnull):
                 cut = CLI()
                 cut.parse_command_args(args)
 
+    # ------------------------------------------------------------------------+
+    # tests for CLI._match_clientid()
+    # ------------------------------------------------------------------------+
+
+    @unittest.mock.patch('os.path.expanduser')
+    def test_match_clientid(self, mock_expanduser):
+        """Test CLI._match_clientid().
+
+        Patterns without a '*' match anywhere in the client ID; other
+        patterns are anchored wildcard matches.
+
+        """
+        mock_expanduser.side_effect = \
+            lambda x: self._side_effect_expand_user(x)
+        cut = CLI()
+        cd = ClientData(
+            clientId="012345@nom.deplume", sharedSecret="ABCDEFGH")
+        self.assertTrue(cut._match_clientid(cd, "*"))
+        self.assertTrue(cut._match_clientid(cd, ""))
+        self.assertTrue(cut._match_clientid(cd, "@nom"))
+        self.assertTrue(cut._match_clientid(cd, "012345@nom.deplume"))
+        self.assertFalse(cut._match_clientid(cd, "@NOM"))
+        self.assertFalse(cut._match_clientid(cd, "@nom?deplume"))
+        self.assertTrue(cut._match_clientid(cd, "*@nom.deplume"))
+        self.assertTrue(cut._match_clientid(cd, "012*deplume"))
+        self.assertFalse(cut._match_clientid(cd, "*@nom"))
+
     # ------------------------------------------------------------------------+
     # tests for CLI.create_data_file()
     # ------------------------------------------------------------------------+
@@ -957,7 +920,7 @@ class CoreCLITests(unittest.TestCase):
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
         expected_passphrase = "Maresy doats and dosey doats."
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             'yes', expected_passphrase, expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -968,7 +931,6 @@ class CoreCLITests(unittest.TestCase):
             unittest.mock.call.write(
                 "No data file was found. Do you want to create your data" +
                 " file? (yes|no) [yes]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline(),
             unittest.mock.call.write("Enter passphrase: "),
@@ -980,7 +942,7 @@ class CoreCLITests(unittest.TestCase):
             unittest.mock.call.flush(),
             unittest.mock.call.readline()]
         rw_mock.assert_has_calls(calls)
-        self.assertEqual(6, rw_mock.write.call_count)
+        self.assertEqual(5, rw_mock.write.call_count)
         self.assertEqual(3, rw_mock.flush.call_count)
         self.assertEqual(3, rw_mock.readline.call_count)
         self.assertEqual(expected_passphrase, cut._CLI__passphrase)
@@ -997,7 +959,7 @@ class CoreCLITests(unittest.TestCase):
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
         expected_passphrase = "Maresy doats and dosey doats."
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             '', expected_passphrase, expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -1008,7 +970,6 @@ class CoreCLITests(unittest.TestCase):
             unittest.mock.call.write(
                 "No data file was found. Do you want to create your data" +
                 " file? (yes|no) [yes]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline(),
             unittest.mock.call.write("Enter passphrase: "),
@@ -1020,7 +981,7 @@ class CoreCLITests(unittest.TestCase):
             unittest.mock.call.flush(),
             unittest.mock.call.readline()]
         rw_mock.assert_has_calls(calls)
-        self.assertEqual(6, rw_mock.write.call_count)
+        self.assertEqual(5, rw_mock.write.call_count)
         self.assertEqual(3, rw_mock.flush.call_count)
         self.assertEqual(3, rw_mock.readline.call_count)
         self.assertEqual(expected_passphrase, cut._CLI__passphrase)
@@ -1036,7 +997,7 @@ class CoreCLITests(unittest.TestCase):
         """
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             'no']
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -1047,11 +1008,10 @@ class CoreCLITests(unittest.TestCase):
             unittest.mock.call.write(
                 "No data file was found. Do you want to create your data" +
                 " file? (yes|no) [yes]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline()]
         rw_mock.assert_has_calls(calls)
-        self.assertEqual(2, rw_mock.write.call_count)
+        self.assertEqual(1, rw_mock.write.call_count)
         self.assertEqual(1, rw_mock.flush.call_count)
         self.assertEqual(1, rw_mock.readline.call_count)
 
@@ -1073,7 +1033,7 @@ class CoreCLITests(unittest.TestCase):
             lambda x: self._side_effect_expand_user(x)
         expected_passphrase = "Maresy doats and dosey doats."
         expected_shared_secret = "ABCDEFGHABCDEFGHABCDEFGH"
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             'yes', expected_passphrase, expected_passphrase,
             expected_shared_secret]
@@ -1086,7 +1046,6 @@ class CoreCLITests(unittest.TestCase):
             unittest.mock.call.write(
                 "No data file was found. Do you want to create your data" +
                 " file? (yes|no) [yes]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline(),
             unittest.mock.call.write("Enter passphrase: "),
@@ -1102,7 +1061,7 @@ class CoreCLITests(unittest.TestCase):
             unittest.mock.call.flush(),
             unittest.mock.call.readline()]
         rw_mock.assert_has_calls(calls)
-        self.assertEqual(8, rw_mock.write.call_count)
+        self.assertEqual(7, rw_mock.write.call_count)
         self.assertEqual(4, rw_mock.flush.call_count)
         self.assertEqual(4, rw_mock.readline.call_count)
         self.assertEqual(expected_passphrase, cut._CLI__passphrase)
@@ -1122,7 +1081,7 @@ class CoreCLITests(unittest.TestCase):
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             'no']
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -1134,11 +1093,10 @@ class CoreCLITests(unittest.TestCase):
             unittest.mock.call.write(
                 "No data file was found. Do you want to create your data" +
                 " file? (yes|no) [yes]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline()]
         rw_mock.assert_has_calls(calls)
-        self.assertEqual(2, rw_mock.write.call_count)
+        self.assertEqual(1, rw_mock.write.call_count)
         self.assertEqual(1, rw_mock.flush.call_count)
         self.assertEqual(1, rw_mock.readline.call_count)
         self.assertIsNone(cut._CLI__passphrase)
@@ -1158,7 +1116,7 @@ class CoreCLITests(unittest.TestCase):
             lambda x: self._side_effect_expand_user(x)
         expected_passphrase = "Maresy doats and dosey doats."
         expected_shared_secret = "ABCDEFGHABCDEFGHABCDEFGH"
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             'yes', expected_passphrase, expected_passphrase,
             expected_shared_secret]
@@ -1171,7 +1129,6 @@ class CoreCLITests(unittest.TestCase):
             unittest.mock.call.write(
                 "No data file was found. Do you want to create your data" +
                 " file? (yes|no) [yes]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline(),
             unittest.mock.call.write("Enter passphrase: "),
@@ -1187,7 +1144,7 @@ class CoreCLITests(unittest.TestCase):
             unittest.mock.call.flush(),
             unittest.mock.call.readline()]
         rw_mock.assert_has_calls(calls)
-        self.assertEqual(8, rw_mock.write.call_count)
+        self.assertEqual(7, rw_mock.write.call_count)
         self.assertEqual(4, rw_mock.flush.call_count)
         self.assertEqual(4, rw_mock.readline.call_count)
         self.assertEqual(expected_passphrase, cut._CLI__passphrase)
@@ -1209,7 +1166,7 @@ class CoreCLITests(unittest.TestCase):
         expected_passphrase = "Maresy doats and dosey doats."
         expected_shared_secret = "ABCDEFGHABCDEFGHABCDEFGH"
         provided_shared_secret = "abcd efgh abcd efgh abcd efgh"
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             'yes', expected_passphrase, expected_passphrase,
             provided_shared_secret]
@@ -1222,7 +1179,6 @@ class CoreCLITests(unittest.TestCase):
             unittest.mock.call.write(
                 "No data file was found. Do you want to create your data" +
                 " file? (yes|no) [yes]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline(),
             unittest.mock.call.write("Enter passphrase: "),
@@ -1238,7 +1194,7 @@ class CoreCLITests(unittest.TestCase):
             unittest.mock.call.flush(),
             unittest.mock.call.readline()]
         rw_mock.assert_has_calls(calls)
-        self.assertEqual(8, rw_mock.write.call_count)
+        self.assertEqual(7, rw_mock.write.call_count)
         self.assertEqual(4, rw_mock.flush.call_count)
         self.assertEqual(4, rw_mock.readline.call_count)
         self.assertEqual(expected_passphrase, cut._CLI__passphrase)
@@ -1258,7 +1214,7 @@ class CoreCLITests(unittest.TestCase):
             lambda x: self._side_effect_expand_user(x)
         expected_passphrase = "Maresy doats and dosey doats."
         provided_shared_secret = ""
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             'yes', expected_passphrase, expected_passphrase,
             provided_shared_secret]
@@ -1271,7 +1227,6 @@ class CoreCLITests(unittest.TestCase):
             unittest.mock.call.write(
                 "No data file was found. Do you want to create your data" +
                 " file? (yes|no) [yes]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline(),
             unittest.mock.call.write("Enter passphrase: "),
@@ -1287,7 +1242,7 @@ class CoreCLITests(unittest.TestCase):
             unittest.mock.call.flush(),
             unittest.mock.call.readline()]
         rw_mock.assert_has_calls(calls)
-        self.assertEqual(8, rw_mock.write.call_count)
+        self.assertEqual(7, rw_mock.write.call_count)
         self.assertEqual(4, rw_mock.flush.call_count)
         self.assertEqual(4, rw_mock.readline.call_count)
         self.assertEqual(expected_passphrase, cut._CLI__passphrase)
@@ -1306,7 +1261,7 @@ class CoreCLITests(unittest.TestCase):
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
         expected_passphrase = "Maresy doats and dosey doats."
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             'yes', expected_passphrase, ""]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -1318,7 +1273,6 @@ class CoreCLITests(unittest.TestCase):
             unittest.mock.call.write(
                 "No data file was found. Do you want to create your data" +
                 " file? (yes|no) [yes]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline(),
             unittest.mock.call.write("Enter passphrase: "),
@@ -1330,7 +1284,7 @@ class CoreCLITests(unittest.TestCase):
             unittest.mock.call.flush(),
             unittest.mock.call.readline()]
         rw_mock.assert_has_calls(calls)
-        self.assertEqual(6, rw_mock.write.call_count)
+        self.assertEqual(5, rw_mock.write.call_count)
         self.assertEqual(3, rw_mock.flush.call_count)
         self.assertEqual(3, rw_mock.readline.call_count)
         self.assertIsNone(cut._CLI__passphrase)
@@ -1350,7 +1304,7 @@ class CoreCLITests(unittest.TestCase):
             lambda x: self._side_effect_expand_user(x)
         expected_passphrase = "Maresy doats and dosey doats."
         confirmed_passphrase = "Mares eat oats and does eat oats."
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             'yes', expected_passphrase, confirmed_passphrase,
             expected_passphrase, expected_passphrase, ""]
@@ -1363,7 +1317,6 @@ class CoreCLITests(unittest.TestCase):
             unittest.mock.call.write(
                 "No data file was found. Do you want to create your data" +
                 " file? (yes|no) [yes]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline(),
             unittest.mock.call.write("Enter passphrase: "),
@@ -1389,7 +1342,7 @@ class CoreCLITests(unittest.TestCase):
             unittest.mock.call.flush(),
             unittest.mock.call.readline()]
         rw_mock.assert_has_calls(calls)
-        self.assertEqual(14, rw_mock.write.call_count)
+        self.assertEqual(13, rw_mock.write.call_count)
         self.assertEqual(6, rw_mock.flush.call_count)
         self.assertEqual(6, rw_mock.readline.call_count)
         self.assertEqual(expected_passphrase, cut._CLI__passphrase)
@@ -1406,7 +1359,7 @@ class CoreCLITests(unittest.TestCase):
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
         args = ("delete", "sam@i.am")
         cut.parse_command_args(args)
@@ -1433,7 +1386,7 @@ class CoreCLITests(unittest.TestCase):
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
         args = ("generate", )
         cut.parse_command_args(args)
@@ -1459,7 +1412,7 @@ class CoreCLITests(unittest.TestCase):
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
         args = ("list", )
         cut.parse_command_args(args)
@@ -1486,7 +1439,7 @@ class CoreCLITests(unittest.TestCase):
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
         args = ("set", "passphrase")
         cut.parse_command_args(args)
@@ -1509,8 +1462,6 @@ class CoreCLITests(unittest.TestCase):
         Check that setting the passphrase captures the new passphrase.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -1520,10 +1471,10 @@ class CoreCLITests(unittest.TestCase):
             self.temp_dir_path.name, ".authenticator")
         expected_passphrase = "Maresy doats and dosey doats."
         expected_new_passphrase = "And little lambsy divey."
-        self._add_three_hotp_to_file(expected_passphrase)
+        self._copy_three_hotp_to_file(expected_passphrase)
         # Change the passphrase
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase,
             expected_new_passphrase, expected_new_passphrase]
@@ -1565,7 +1516,7 @@ class CoreCLITests(unittest.TestCase):
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
         args = (
             "set", "clientid",
@@ -1589,8 +1540,6 @@ class CoreCLITests(unittest.TestCase):
         Check that setting a clientid prompts for the passphrase.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -1599,10 +1548,10 @@ class CoreCLITests(unittest.TestCase):
         expected_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
         expected_passphrase = "Maresy doats and dosey doats."
-        self._add_three_hotp_to_file(expected_passphrase)
+        self._copy_three_hotp_to_file(expected_passphrase)
         # Change the clientId
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -1641,8 +1590,6 @@ class CoreCLITests(unittest.TestCase):
         Check that a HOTP configuration can be added.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -1652,7 +1599,7 @@ class CoreCLITests(unittest.TestCase):
             expected_data_dir, "authenticator.data")
         expected_passphrase = "Maresy doats and dosey doats."
         expected_shared_secret = "GEZDGNBVGY2TQOJQGEZDGNBVGY2TQOJQ"
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             'yes', expected_passphrase, expected_passphrase,
             expected_shared_secret]
@@ -1680,8 +1627,6 @@ class CoreCLITests(unittest.TestCase):
         fail with an appropriate error message.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -1691,7 +1636,7 @@ class CoreCLITests(unittest.TestCase):
             expected_data_dir, "authenticator.data")
         expected_passphrase = "Maresy doats and dosey doats."
         expected_shared_secret = "ABCDEFGHABCDEFGHABCDEFGH"
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             'yes', expected_passphrase, expected_passphrase,
             expected_shared_secret]
@@ -1737,8 +1682,6 @@ class CoreCLITests(unittest.TestCase):
         that is lowercase with embedded spaces.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -1748,7 +1691,7 @@ class CoreCLITests(unittest.TestCase):
             expected_data_dir, "authenticator.data")
         expected_passphrase = "Maresy doats and dosey doats."
         googlized_shared_secret = "gezd gnbv gy2t qojq gezd gnbv gy2t qojq"
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             'yes', expected_passphrase, expected_passphrase,
             googlized_shared_secret]
@@ -1775,22 +1718,24 @@ class CoreCLITests(unittest.TestCase):
         Check that a HOTP configuration can be added.
 
         """
-        import os.path
-        import os
-
+        # Only this test needs a second directory, so make it here rather
+        # than in setUp()
+        #
+        temp_dir_path2 = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir_path2.cleanup)
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
         initial_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
         expected_data_dir = os.path.join(
-            self.temp_dir_path2.name, ".authenticator")
+            temp_dir_path2.name, ".authenticator")
         os.makedirs(expected_data_dir, mode=0o766)
         expected_data_file = os.path.join(
             expected_data_dir, "authenticator.data")
         expected_passphrase = "Maresy doats and dosey doats."
         expected_shared_secret = "GEZDGNBVGY2TQOJQGEZDGNBVGY2TQOJQ"
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             'yes', expected_passphrase, expected_passphrase,
             expected_shared_secret]
@@ -1820,8 +1765,6 @@ class CoreCLITests(unittest.TestCase):
         Check that deleting the last config works properly.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -1830,10 +1773,10 @@ class CoreCLITests(unittest.TestCase):
         expected_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
         expected_passphrase = "Maresy doats and dosey doats."
-        self._add_three_hotp_to_file(expected_passphrase)
+        self._copy_three_hotp_to_file(expected_passphrase)
         # Delete the configuration
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -1862,8 +1805,6 @@ class CoreCLITests(unittest.TestCase):
         confirmation prompt for each.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -1872,10 +1813,10 @@ class CoreCLITests(unittest.TestCase):
         expected_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
         expected_passphrase = "Maresy doats and dosey doats."
-        self._add_three_hotp_to_file(expected_passphrase)
+        self._copy_three_hotp_to_file(expected_passphrase)
         # Delete the configuration
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -1891,17 +1832,14 @@ class CoreCLITests(unittest.TestCase):
         calls = [
             unittest.mock.call.write(
                 "Delete 012345@nom.deplume? (yes|no) [no]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline(),
             unittest.mock.call.write(
                 "Delete mickey@prisney.com? (yes|no) [no]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline(),
             unittest.mock.call.write(
                 "Delete donald@prisney.com? (yes|no) [no]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline(),
             unittest.mock.call.write("Deleted 3 configurations."),
@@ -1922,8 +1860,6 @@ class CoreCLITests(unittest.TestCase):
         supplied each time.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -1932,10 +1868,10 @@ class CoreCLITests(unittest.TestCase):
         expected_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
         expected_passphrase = "Maresy doats and dosey doats."
-        self._add_three_hotp_to_file(expected_passphrase)
+        self._copy_three_hotp_to_file(expected_passphrase)
         # Delete the configuration
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -1951,17 +1887,14 @@ class CoreCLITests(unittest.TestCase):
         calls = [
             unittest.mock.call.write(
                 "Delete 012345@nom.deplume? (yes|no) [no]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline(),
             unittest.mock.call.write(
                 "Delete mickey@prisney.com? (yes|no) [no]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline(),
             unittest.mock.call.write(
                 "Delete donald@prisney.com? (yes|no) [no]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline(),
             unittest.mock.call.write("No configurations deleted."),
@@ -1981,8 +1914,6 @@ class CoreCLITests(unittest.TestCase):
         has a "no" response.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -1991,10 +1922,10 @@ class CoreCLITests(unittest.TestCase):
         expected_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
         expected_passphrase = "Maresy doats and dosey doats."
-        self._add_three_hotp_to_file(expected_passphrase)
+        self._copy_three_hotp_to_file(expected_passphrase)
         # Delete the configuration
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -2010,7 +1941,6 @@ class CoreCLITests(unittest.TestCase):
         calls = [
             unittest.mock.call.write(
                 "Delete 012345@nom.deplume? (yes|no) [no]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline(),
             unittest.mock.call.write("No configurations deleted."),
@@ -2028,8 +1958,6 @@ class CoreCLITests(unittest.TestCase):
         Check that deleting one of the several configurations works properly.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -2038,10 +1966,10 @@ class CoreCLITests(unittest.TestCase):
         expected_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
         expected_passphrase = "Maresy doats and dosey doats."
-        self._add_three_hotp_to_file(expected_passphrase)
+        self._copy_three_hotp_to_file(expected_passphrase)
         # Delete the configuration
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -2070,8 +1998,6 @@ class CoreCLITests(unittest.TestCase):
         configurations works properly.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -2080,10 +2006,10 @@ class CoreCLITests(unittest.TestCase):
         expected_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
         expected_passphrase = "Maresy doats and dosey doats."
-        self._add_three_hotp_to_file(expected_passphrase)
+        self._copy_three_hotp_to_file(expected_passphrase)
         # Delete the configuration
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -2099,7 +2025,6 @@ class CoreCLITests(unittest.TestCase):
         calls = [
             unittest.mock.call.write(
                     "Delete 012345@nom.deplume? (yes|no) [no]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline(),
             unittest.mock.call.write("Deleted 1 configuration."),
@@ -2119,8 +2044,6 @@ class CoreCLITests(unittest.TestCase):
         has the default response (no).
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -2129,10 +2052,10 @@ class CoreCLITests(unittest.TestCase):
         expected_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
         expected_passphrase = "Maresy doats and dosey doats."
-        self._add_three_hotp_to_file(expected_passphrase)
+        self._copy_three_hotp_to_file(expected_passphrase)
         # Delete the configuration
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -2148,7 +2071,6 @@ class CoreCLITests(unittest.TestCase):
         calls = [
             unittest.mock.call.write(
                 "Delete 012345@nom.deplume? (yes|no) [no]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline(),
             unittest.mock.call.write("No configurations deleted."),
@@ -2167,8 +2089,6 @@ class CoreCLITests(unittest.TestCase):
         Check that deleting the last config works properly.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -2180,7 +2100,7 @@ class CoreCLITests(unittest.TestCase):
         self._add_one_time_based_hotp_to_file(expected_passphrase)
         # Delete the configuration
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -2209,8 +2129,6 @@ class CoreCLITests(unittest.TestCase):
         configurations works properly.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -2222,7 +2140,7 @@ class CoreCLITests(unittest.TestCase):
         self._add_one_time_based_hotp_to_file(expected_passphrase)
         # Delete the configuration
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -2238,7 +2156,6 @@ class CoreCLITests(unittest.TestCase):
         calls = [
             unittest.mock.call.write(
                 "Delete 012345@nom.deplume? (yes|no) [no]: "),
-            unittest.mock.call.write(""),
             unittest.mock.call.flush(),
             unittest.mock.call.readline(),
             unittest.mock.call.write("Deleted 1 configuration."),
@@ -2260,8 +2177,6 @@ class CoreCLITests(unittest.TestCase):
         Check that deleting one of the several configurations works properly.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -2270,10 +2185,10 @@ class CoreCLITests(unittest.TestCase):
         expected_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
         expected_passphrase = "Maresy doats and dosey doats."
-        self._add_three_hotp_to_file(expected_passphrase)
+        self._copy_three_hotp_to_file(expected_passphrase)
         # Generate the codes
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -2299,8 +2214,6 @@ class CoreCLITests(unittest.TestCase):
         Check that deleting one of the several configurations works properly.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -2309,10 +2222,10 @@ class CoreCLITests(unittest.TestCase):
         expected_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
         expected_passphrase = "Maresy doats and dosey doats."
-        self._add_three_hotp_to_file(expected_passphrase)
+        self._copy_three_hotp_to_file(expected_passphrase)
         # Generate the codes
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -2342,8 +2255,6 @@ class CoreCLITests(unittest.TestCase):
         Check that deleting one of the several configurations works properly.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -2352,10 +2263,10 @@ class CoreCLITests(unittest.TestCase):
         expected_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
         expected_passphrase = "Maresy doats and dosey doats."
-        self._add_three_hotp_to_file(expected_passphrase)
+        self._copy_three_hotp_to_file(expected_passphrase)
         # Generate the codes
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -2387,10 +2298,10 @@ class CoreCLITests(unittest.TestCase):
         # Add the configurations
         #
         expected_passphrase = "Maresy doats and dosey doats."
-        self._add_three_hotp_to_file(expected_passphrase)
+        self._copy_three_hotp_to_file(expected_passphrase)
         # Generate the codes
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -2433,14 +2344,12 @@ class CoreCLITests(unittest.TestCase):
         Check that the correct response is provided when no data is found.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
         expected_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
         self.assertEqual(expected_data_dir, cut._CLI__data_dir)
         args = ("list", )
@@ -2463,8 +2372,6 @@ class CoreCLITests(unittest.TestCase):
         is found.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -2476,7 +2383,7 @@ class CoreCLITests(unittest.TestCase):
         self._add_one_time_based_hotp_to_file(expected_passphrase)
         # List the configuration
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -2505,8 +2412,6 @@ class CoreCLITests(unittest.TestCase):
         configuration is found.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -2518,7 +2423,7 @@ class CoreCLITests(unittest.TestCase):
         self._add_one_time_based_hotp_to_file(expected_passphrase)
         # List the configuration
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -2551,8 +2456,6 @@ class CoreCLITests(unittest.TestCase):
         are found.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -2561,10 +2464,10 @@ class CoreCLITests(unittest.TestCase):
         expected_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
         expected_passphrase = "Maresy doats and dosey doats."
-        self._add_three_hotp_to_file(expected_passphrase)
+        self._copy_three_hotp_to_file(expected_passphrase)
         # List the configurations
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -2597,9 +2500,6 @@ class CoreCLITests(unittest.TestCase):
         configuration is found.
 
         """
-        import os.path
-        from datetime import datetime
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -2609,10 +2509,10 @@ class CoreCLITests(unittest.TestCase):
             self.temp_dir_path.name, ".authenticator")
         expected_passphrase = "Maresy doats and dosey doats."
         self._add_three_hotp_to_file(expected_passphrase)
-        now = datetime.now(self.__tz)
+        now = datetime.now(_LOCAL_TZ)
         # List the configurations
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -2665,8 +2565,6 @@ class CoreCLITests(unittest.TestCase):
         are found with a wildcard pattern having no '*' chars.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -2675,10 +2573,10 @@ class CoreCLITests(unittest.TestCase):
         expected_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
         expected_passphrase = "Maresy doats and dosey doats."
-        self._add_three_hotp_to_file(expected_passphrase)
+        self._copy_three_hotp_to_file(expected_passphrase)
         # List the configurations
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -2711,8 +2609,6 @@ class CoreCLITests(unittest.TestCase):
         Check that deleting the last config works properly.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -2722,10 +2618,10 @@ class CoreCLITests(unittest.TestCase):
             self.temp_dir_path.name, ".authenticator")
         expected_passphrase = "Maresy doats and dosey doats."
         expected_new_passphrase = "And little lambsy divey."
-        self._add_three_hotp_to_file(expected_passphrase)
+        self._copy_three_hotp_to_file(expected_passphrase)
         # Change the passphrase
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase,
             expected_new_passphrase, expected_new_passphrase]
@@ -2743,7 +2639,7 @@ class CoreCLITests(unittest.TestCase):
         rw_mock.assert_has_calls(calls)
         # List the configurations
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_new_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -2777,8 +2673,6 @@ class CoreCLITests(unittest.TestCase):
         Happy path for changing a client id; check that the change takes place.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -2787,10 +2681,10 @@ class CoreCLITests(unittest.TestCase):
         expected_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
         expected_passphrase = "Maresy doats and dosey doats."
-        self._add_three_hotp_to_file(expected_passphrase)
+        self._copy_three_hotp_to_file(expected_passphrase)
         # Change the clientId
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock, stderr=rw_mock)
@@ -2809,7 +2703,7 @@ class CoreCLITests(unittest.TestCase):
         rw_mock.assert_has_calls(calls)
         # List the configurations
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -2841,8 +2735,6 @@ class CoreCLITests(unittest.TestCase):
         Try changing a clientid for a HOTP configuration that does not exist.
 
         """
-        import os.path
-
         mock_key_stretches.return_value = 64
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
@@ -2851,10 +2743,10 @@ class CoreCLITests(unittest.TestCase):
         expected_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
         expected_passphrase = "Maresy doats and dosey doats."
-        self._add_three_hotp_to_file(expected_passphrase)
+        self._copy_three_hotp_to_file(expected_passphrase)
         # Change the clientId
         #
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock, stderr=rw_mock)
@@ -2885,8 +2777,6 @@ class CoreCLITests(unittest.TestCase):
         Check that the default directory is chosen properly.
 
         """
-        import os.path
-
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
         expected_data_dir = os.path.join(
@@ -2901,8 +2791,6 @@ class CoreCLITests(unittest.TestCase):
         Check that the default filepath is generated properly.
 
         """
-        import os.path
-
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
         expected_data_dir = os.path.join(
@@ -2910,7 +2798,7 @@ class CoreCLITests(unittest.TestCase):
         expected_data_file = os.path.join(
             expected_data_dir, "authenticator.data")
         expected_passphrase = "Maresy doats and dosey doats."
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         rw_mock.readline.side_effect = [
             expected_passphrase]
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
@@ -2923,14 +2811,11 @@ class CoreCLITests(unittest.TestCase):
         Make certain the --version option produces correct output.
 
         """
-        import os.path
-        import authenticator
-
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
         expected_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
         self.assertEqual(expected_data_dir, cut._CLI__data_dir)
         args = ("--version", )
@@ -2953,16 +2838,13 @@ class CoreCLITests(unittest.TestCase):
         Make certain the info subcommand produces correct output.
 
         """
-        import os.path
-        import authenticator
-
         mock_expanduser.side_effect = \
             lambda x: self._side_effect_expand_user(x)
         expected_data_dir = os.path.join(
             self.temp_dir_path.name, ".authenticator")
         expected_data_file = os.path.join(
             expected_data_dir, "authenticator.data")
-        rw_mock = unittest.mock.MagicMock()
+        rw_mock = _mock_stream()
         cut = CLI(stdin=rw_mock, stdout=rw_mock)
         self.assertEqual(expected_data_dir, cut._CLI__data_dir)
         args = ("info", )
@@ -120,6 +120,19 @@ class CoreClientDataTests(unittest.TestCase):
         with self.assertRaises(ValueError):
             ClientData(**args)
 
+    def test_constructor_none_client_id(self):
+        """Test for __init__().
+
+        Pass None as client_id.
+
+        """
+        args = {
+            "clientId": None,
+            "sharedSecret": "GEZDGNBVGY3TQOJQGEZDGNBVGY3TQOJQ"
+        }
+        with self.assertRaises(TypeError):
+            ClientData(**args)
+
     def test_constructor_empty_client_id(self):
         """Test for __init__().
 
@@ -158,6 +171,19 @@ class CoreClientDataTests(unittest.TestCase):
         with self.assertRaises(ValueError):
             ClientData(**args)
 
+    def test_constructor_none_shared_secret(self):
+        """Test for __init__().
+
+        Pass None as shared_secret.
+
+        """
+        args = {
+            "clientId": "What.Ever.Dude",
+            "sharedSecret": None
+        }
+        with self.assertRaises(TypeError):
+            ClientData(**args)
+
     def test_constructor_empty_shared_secret(self):
         """Test for __init__().
 
@@ -379,6 +405,20 @@ class CoreClientDataTests(unittest.TestCase):
         with self.assertRaises(TypeError):
             ClientData(**args)
 
+    def test_constructor_last_count_update_time_none(self):
+        """Test for __init__().
+
+        Pass None as last_count_update_time.
+
+        """
+        args = {
+            "clientId": "What.Ever.Dude",
+            "sharedSecret": "GEZDGNBVGY3TQOJQGEZDGNBVGY3TQOJQ",
+            "lastCountUpdateTime": None
+        }
+        with self.assertRaises(TypeError):
+            ClientData(**args)
+
     def test_constructor_last_count_update_time_bad_value(self):
         """Test for __init__().
 
@@ -710,10 +750,107 @@ class CoreClientDataTests(unittest.TestCase):
     # Tests for ClientData.__eq__()
     # -------------------------------------------------------------------------
 
+    def test_equal(self):
+        """Test for __eq__().
+
+        Equal when all properties match; unequal otherwise.
+
+        """
+        args = {
+            "clientId": "What.Ever.Dude",
+            "sharedSecret": "GEZDGNBVGY3TQOJQGEZDGNBVGY3TQOJQ"
+        }
+        cut = ClientData(**args)
+        self.assertTrue(cut == ClientData(**args))
+        args["note"] = "This is not a note."
+        self.assertFalse(cut == ClientData(**args))
+        self.assertFalse(cut == "What.Ever.Dude")
+
     # -------------------------------------------------------------------------
     # Tests for ClientData.__ne__()
     # -------------------------------------------------------------------------
 
+    def test_not_equal(self):
+        """Test for __ne__().
+
+        Not equal is the inverse of equal.
+
+        """
+        args = {
+            "clientId": "What.Ever.Dude",
+            "sharedSecret": "GEZDGNBVGY3TQOJQGEZDGNBVGY3TQOJQ"
+        }
+        cut = ClientData(**args)
+        self.assertFalse(cut != ClientData(**args))
+        args["tags"] = ["test"]
+        self.assertTrue(cut != ClientData(**args))
+        self.assertTrue(cut != "What.Ever.Dude")
+
+    def test_tags_is_a_list_copy(self):
+        """Test for tags().
+
+        tags() returns a list, which can be changed without changing the
+        object.
+
+        """
+        args = {
+            "clientId": "What.Ever.Dude",
+            "sharedSecret": "GEZDGNBVGY3TQOJQGEZDGNBVGY3TQOJQ",
+            "tags": ["one"]
+        }
+        cut = ClientData(**args)
+        tags = cut.tags()
+        self.assertIsInstance(tags, list)
+        tags.append("two")
+        self.assertEqual(["one"], cut.tags())
+
+    # -------------------------------------------------------------------------
+    # Tests for ClientData.to_dict()
+    # -------------------------------------------------------------------------
+
+    def test_to_dict_after_increment(self):
+        """Test for to_dict().
+
+        The dictionary reflects changes made after it was first produced.
+
+        """
+        args = {
+            "clientId": "What.Ever.Dude",
+            "sharedSecret": "GEZDGNBVGY3TQOJQGEZDGNBVGY3TQOJQ",
+            "counterFromTime": False
+        }
+        cut = ClientData(**args)
+        self.assertEqual(0, cut.to_dict()["lastCount"])
+        cut.incremented_count()
+        d = cut.to_dict()
+        self.assertEqual(1, d["lastCount"])
+        self.assertEqual(
+            cut.last_count_update_time(), d["lastCountUpdateTime"])
+        cut.set_last_count_update_time("20130704T131415-0500")
+        self.assertEqual(
+            "20130704T131415-0500", cut.to_dict()["lastCountUpdateTime"])
+
+    def test_to_dict_is_a_copy(self):
+        """Test for to_dict().
+
+        Changing the returned dictionary does not change the object, or
+        the dictionaries returned later.
+
+        """
+        args = {
+            "clientId": "What.Ever.Dude",
+            "sharedSecret": "GEZDGNBVGY3TQOJQGEZDGNBVGY3TQOJQ",
+            "tags": ["one"]
+        }
+        cut = ClientData(**args)
+        d = cut.to_dict()
+        d["clientId"] = "Someone.Else"
+        d["tags"].append("two")
+        d = cut.to_dict()
+        self.assertEqual("What.Ever.Dude", d["clientId"])
+        self.assertEqual(["one"], d["tags"])
+        self.assertEqual("What.Ever.Dude", cut.client_id())
+
     # -------------------------------------------------------------------------
     # Tests for JSON encoding/decoding
     # -------------------------------------------------------------------------
@@ -4,8 +4,29 @@
 #
 """Unit tests for ClientFile in data.py."""
 
+import json
+import os
+import tempfile
 import unittest
-from authenticator import ClientData, ClientFile
+import unittest.mock
+from authenticator import ClientData, ClientFile, FileCorruptionError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# A data file document whose note holds a raw (unescaped) line feed, as
+# the standard library parser accepts with strict=False
+#
+_RAW_LINE_FEED_DOCUMENT = b"""[
+    {
+        "clientId": "What.Ever.Dude",
+        "note": "Line one.
+Line two.",
+        "sharedSecret": "GEZDGNBVGY3TQOJQGEZDGNBVGY3TQOJQ"
+    }
+]"""
 
 
 class CoreClientFileTests(unittest.TestCase):
@@ -115,3 +136,162 @@ class CoreClientFileTests(unittest.TestCase):
             CoreClientFileTests._cut.save(filepath, expected)
             actual = CoreClientFileTests._cut.load(filepath)
             self.assertEqual(expected, actual)
+
+    def test_save_failure_keeps_data_file(self):
+        """Test for Save().
+
+        A Save() that fails while encrypting leaves the existing data file
+        as it was.
+
+        """
+        expected = [ClientData(
+            clientId="What.Ever.Dude",
+            sharedSecret="GEZDGNBVGY3TQOJQGEZDGNBVGY3TQOJQ")]
+        changed = expected + [ClientData(
+            clientId="You.Dont.Say",
+            sharedSecret="GEZDGNBVGY3TQOJQGEZDGNBVGY3TQOJQ")]
+
+        with tempfile.TemporaryDirectory() as tempDirPath:
+            filepath = tempDirPath + os.sep + "hotp.data"
+            CoreClientFileTests._cut.save(filepath, expected)
+            with unittest.mock.patch.object(
+                    CoreClientFileTests._cut, '_encrypt',
+                    side_effect=ValueError()):
+                with self.assertRaises(ValueError):
+                    CoreClientFileTests._cut.save(filepath, changed)
+            actual = CoreClientFileTests._cut.load(filepath)
+            self.assertEqual(expected, actual)
+
+    def _write_raw_data_file(self, filepath, document):
+        """Write a data file holding the given JSON document, unchanged.
+
+        Args:
+            filepath: the fully qualified path to the data file.
+            document: the JSON document, as a byte string.
+
+        """
+        cut = CoreClientFileTests._cut
+        cut.save(filepath, [])
+        with open(filepath, 'rb') as f:
+            header = f.read(16)
+        with open(filepath, 'wb') as f:
+            f.write(header)
+            f.write(cut._encrypt(header + document))
+
+    def test_load_raw_line_feed_without_orjson(self):
+        """Test for Load().
+
+        Without orjson, a note holding a raw line feed still loads.
+
+        """
+        with tempfile.TemporaryDirectory() as tempDirPath:
+            filepath = tempDirPath + os.sep + "hotp.data"
+            self._write_raw_data_file(filepath, _RAW_LINE_FEED_DOCUMENT)
+            with unittest.mock.patch('authenticator.data.orjson', None):
+                actual = CoreClientFileTests._cut.load(filepath)
+        self.assertEqual(1, len(actual))
+        self.assertEqual("Line one.\nLine two.", actual[0].note())
+
+    def test_load_raw_line_feed_with_orjson(self):
+        """Test for Load().
+
+        With orjson, which rejects raw control characters in strings, a note
+        holding a raw line feed still loads, by falling back to the standard
+        library parser. The stand-in for orjson parses strictly, like orjson.
+
+        """
+        fake_orjson = unittest.mock.Mock(spec=['JSONDecodeError', 'loads'])
+        fake_orjson.JSONDecodeError = json.JSONDecodeError
+        fake_orjson.loads.side_effect = lambda b: json.loads(str(b, 'utf-8'))
+        with tempfile.TemporaryDirectory() as tempDirPath:
+            filepath = tempDirPath + os.sep + "hotp.data"
+            self._write_raw_data_file(filepath, _RAW_LINE_FEED_DOCUMENT)
+            with unittest.mock.patch('authenticator.data.orjson', fake_orjson):
+                actual = CoreClientFileTests._cut.load(filepath)
+        self.assertEqual(1, fake_orjson.loads.call_count)
+        self.assertEqual(1, len(actual))
+        self.assertEqual("Line one.\nLine two.", actual[0].note())
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    def test_load_raw_line_feed_with_real_orjson(self):
+        """Test for Load().
+
+        With the real orjson, a note holding a raw line feed still loads.
+
+        """
+        with tempfile.TemporaryDirectory() as tempDirPath:
+            filepath = tempDirPath + os.sep + "hotp.data"
+            self._write_raw_data_file(filepath, _RAW_LINE_FEED_DOCUMENT)
+            with unittest.mock.patch('authenticator.data.orjson', orjson):
+                actual = CoreClientFileTests._cut.load(filepath)
+        self.assertEqual("Line one.\nLine two.", actual[0].note())
+
+    def test_save_layout_without_orjson(self):
+        """Test for Save().
+
+        Without orjson, the JSON document is indented by 4.
+
+        """
+        self._check_save_layout(None)
+
+    def test_save_layout_with_orjson(self):
+        """Test for Save().
+
+        With orjson, the JSON document is laid out just as without it.
+
+        """
+        fake_orjson = unittest.mock.Mock(spec=['JSONDecodeError', 'loads'])
+        fake_orjson.JSONDecodeError = json.JSONDecodeError
+        fake_orjson.loads.side_effect = lambda b: json.loads(str(b, 'utf-8'))
+        self._check_save_layout(fake_orjson)
+
+    def _check_save_layout(self, orjson_module):
+        """Save with orjson patched, and check the document's layout.
+
+        Args:
+            orjson_module: the module to use as orjson, or None.
+
+        """
+        cd = ClientData(
+            clientId="What.Ever.Dude",
+            sharedSecret="GEZDGNBVGY3TQOJQGEZDGNBVGY3TQOJQ")
+        cut = CoreClientFileTests._cut
+        with tempfile.TemporaryDirectory() as tempDirPath:
+            filepath = tempDirPath + os.sep + "hotp.data"
+            with unittest.mock.patch(
+                    'authenticator.data.orjson', orjson_module):
+                cut.save(filepath, [cd])
+                self.assertEqual([cd], cut.load(filepath))
+            with open(filepath, 'rb') as f:
+                document = cut._decrypt(f.read()[16:])[16:]
+        expected = bytes(json.dumps(
+            [cd.to_dict()], sort_keys=True, indent=4,
+            separators=(',', ': ')), 'utf-8')
+        self.assertEqual(expected, document)
+
+    def test_load_empty_file(self):
+        """Test for Load().
+
+        An empty data file is reported as corrupt.
+
+        """
+        with tempfile.TemporaryDirectory() as tempDirPath:
+            filepath = tempDirPath + os.sep + "hotp.data"
+            open(filepath, 'wb').close()
+            with self.assertRaises(FileCorruptionError):
+                CoreClientFileTests._cut.load(filepath)
+
+    def test_load_truncated_file(self):
+        """Test for Load().
+
+        A data file cut short part way through an AES block is reported as
+        corrupt.
+
+        """
+        with tempfile.TemporaryDirectory() as tempDirPath:
+            filepath = tempDirPath + os.sep + "hotp.data"
+            CoreClientFileTests._cut.save(filepath, [])
+            with open(filepath, 'r+b') as f:
+                f.truncate(os.path.getsize(filepath) - 5)
+            with self.assertRaises(FileCorruptionError):
+                CoreClientFileTests._cut.load(filepath)
@@ -429,6 +429,46 @@ class CoreHOTPTests(unittest.TestCase):
         with self.assertRaises(ValueError):
             cut.convert_base32_secret_key(in_string)
 
+    def test_convert_base32_repeated(self):
+        """Test Otp.convert_base32_secret_key().
+
+        Check that converting the same string again gives the same result,
+        and that a bad string is still rejected when converted again.
+
+        """
+        cut = HOTP()
+        in_string = "MFZWS5DVMF2GS33O"
+        first_bytes = cut.convert_base32_secret_key(in_string)
+        self.assertEqual(b"asituation", first_bytes)
+        self.assertEqual(
+            first_bytes, cut.convert_base32_secret_key(in_string))
+        in_string = "ABCDEFG1"
+        for i in range(2):
+            with self.assertRaises(ValueError):
+                cut.convert_base32_secret_key(in_string)
+
+    def test_convert_base32_many_secrets(self):
+        """Test Otp.convert_base32_secret_key().
+
+        Check that converting many different secrets gives the right result
+        for each, while only the most recently used are remembered.
+
+        """
+        import base64
+        from authenticator.hotp import _MAX_CACHED_KEYS
+
+        cut = HOTP()
+        first_bytes = cut.convert_base32_secret_key("MFZWS5DVMF2GS33O")
+        count = _MAX_CACHED_KEYS + 8
+        for i in range(count):
+            secret = "secret{0:04}".format(i).encode('ascii')
+            in_string = str(base64.b32encode(secret), 'ascii')
+            self.assertEqual(secret, cut.convert_base32_secret_key(in_string))
+            self.assertIs(
+                first_bytes,
+                cut.convert_base32_secret_key("MFZWS5DVMF2GS33O"))
+        self.assertEqual(_MAX_CACHED_KEYS, len(cut._HOTP__secret_keys))
+
     # -------------------------------------------------------------------------
     # Tests for Otp.generate_hmac()
     # -------------------------------------------------------------------------
@@ -811,6 +851,116 @@ class CoreHOTPTests(unittest.TestCase):
             cut.generate_code_from_counter(
                 self.secret, self.expected[0][0], code_length=11)
 
+    # -------------------------------------------------------------------------
+    # Tests for Otp.generate_code_from_counter_fast()
+    # -------------------------------------------------------------------------
+
+    def test_generate_code_from_counter_fast(self):
+        """Test Otp.generate_code_from_counter_fast().
+
+        Check that the RFC4226 test cases work for
+        generate_code_from_counter_fast(), and that it agrees with
+        generate_code_from_counter() for other code lengths.
+
+        """
+        cut = HOTP()
+        for i in range(0, 10):
+            code_string = cut.generate_code_from_counter_fast(self.secret, i)
+            self.assertEqual(self.expected[i][3], code_string)
+        for code_length in range(1, 11):
+            self.assertEqual(
+                cut.generate_code_from_counter(
+                    self.secret, 2 ** 40 + 7, code_length=code_length),
+                cut.generate_code_from_counter_fast(
+                    self.secret, 2 ** 40 + 7, code_length=code_length))
+
+    def test_generate_code_from_counter_fast_many_secrets(self):
+        """Test Otp.generate_code_from_counter_fast().
+
+        Check that a secret used between many other secrets keeps its keyed
+        HMAC object, while the least recently used are forgotten.
+
+        """
+        from authenticator.hotp import _MAX_CACHED_KEYS
+
+        cut = HOTP()
+        keyed = cut._keyed_hmac(self.secret)
+        for i in range(_MAX_CACHED_KEYS * 2):
+            other_secret = "secret{0:04}".format(i).encode('ascii')
+            cut.generate_code_from_counter_fast(other_secret, i)
+            self.assertEqual(
+                self.expected[i % 10][3],
+                cut.generate_code_from_counter_fast(self.secret, i % 10))
+        self.assertIs(keyed, cut._keyed_hmac(self.secret))
+        self.assertEqual(_MAX_CACHED_KEYS, len(cut._HOTP__keyed_hmacs))
+
+    # -------------------------------------------------------------------------
+    # Tests for Otp.generate_codes_for_window()
+    # -------------------------------------------------------------------------
+
+    def test_generate_codes_for_window(self):
+        """Test Otp.generate_codes_for_window().
+
+        Check that the RFC4226 test cases work for generate_codes_for_window()
+        and that the window is clipped at counter zero.
+
+        """
+        cut = HOTP()
+        codes = cut.generate_codes_for_window(self.secret, 5, window=4)
+        self.assertEqual(
+            [(i, self.expected[i][3]) for i in range(1, 10)], codes)
+        codes = cut.generate_codes_for_window(self.secret_base32, 1, window=2)
+        self.assertEqual(
+            [(i, self.expected[i][3]) for i in range(0, 4)], codes)
+        # A long key is hashed first, just as HMAC does
+        #
+        long_secret = self.secret * 4
+        codes = cut.generate_codes_for_window(
+            long_secret, 2 ** 40, window=0, code_length=8)
+        self.assertEqual(
+            [(2 ** 40, cut.generate_code_from_counter(
+                long_secret, 2 ** 40, code_length=8))],
+            codes)
+
+    def test_generate_codes_for_window_bad_window(self):
+        """Test Otp.generate_codes_for_window().
+
+        Check for appropriate exception to a negative window.
+
+        """
+        cut = HOTP()
+        with self.assertRaises(ValueError):
+            cut.generate_codes_for_window(self.secret, 5, window=-1)
+
+    # -------------------------------------------------------------------------
+    # Tests for Otp.generate_codes_from_counters()
+    # -------------------------------------------------------------------------
+
+    def test_generate_codes_from_counters(self):
+        """Test Otp.generate_codes_from_counters().
+
+        Check that the RFC4226 test cases work for
+        generate_codes_from_counters(), in the order the counters are given.
+
+        """
+        cut = HOTP()
+        counters = (9, 0, 3, 3, 7)
+        codes = cut.generate_codes_from_counters(self.secret_base32, counters)
+        self.assertEqual([self.expected[i][3] for i in counters], codes)
+        self.assertEqual([], cut.generate_codes_from_counters(self.secret, ()))
+
+    def test_generate_codes_from_counters_counter_bad(self):
+        """Test Otp.generate_codes_from_counters().
+
+        Check for appropriate exception to an out of range counter.
+
+        """
+        cut = HOTP()
+        with self.assertRaises(ValueError):
+            cut.generate_codes_from_counters(self.secret, (1, -1))
+        with self.assertRaises(ValueError):
+            cut.generate_codes_from_counters(self.secret, (2 ** 64,))
+
     # -------------------------------------------------------------------------
     # Tests for Otp.generate_code_from_time()
     # -------------------------------------------------------------------------